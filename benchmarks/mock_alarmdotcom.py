@@ -0,0 +1,299 @@
+"""Local stand-in for the Alarm.com cloud, for benchmarks.
+
+AlarmdotcomClient talks to fixed alarm.com URLs, so the stand-in replaces the
+client itself: MockAlarmdotcomClient exposes the same coroutines, serves a
+SyntheticAccount of any size with a configurable latency and counts requests.
+MockAlarmdotcomServer is a real HTTP server standing in for the web API
+requested through the client's session and for the live event feed.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+import hashlib
+import json
+import random
+import time
+from typing import Any
+
+from aiohttp import web
+
+from pyalarmdotcomredux import AlarmdotcomClient
+
+
+class SyntheticAccount:
+    """An Alarm.com account with generated devices.
+
+    Devices are split between contact/motion sensors, garage doors and
+    thermostats in roughly the proportions seen on real accounts.
+    """
+
+    def __init__(self, devices: int, seed: int = 0) -> None:
+        """Generate the account."""
+        self._random = random.Random(seed)
+        garage_doors = max(1, devices // 50)
+        thermostats = max(1, devices // 20)
+        sensors = max(1, devices - garage_doors - thermostats)
+
+        self.alarm = {
+            "id": "panel-1",
+            "description": "Synthetic Panel",
+            "state": AlarmdotcomClient.ALARM_STATE_DISARMED,
+        }
+        self.sensors = [
+            {
+                "id": "sensor-{}".format(idx),
+                "description": "Sensor {}".format(idx),
+                "deviceType": (
+                    AlarmdotcomClient.DEVICETYPE_MOTION
+                    if idx % 4 == 0
+                    else AlarmdotcomClient.DEVICETYPE_CONTACT
+                ),
+                "state": 1,
+            }
+            for idx in range(sensors)
+        ]
+        self.garage_doors = [
+            {
+                "id": "garage-{}".format(idx),
+                "description": "Garage Door {}".format(idx),
+                "state": AlarmdotcomClient.GARAGE_DOOR_STATE_CLOSED,
+            }
+            for idx in range(garage_doors)
+        ]
+        self.thermostats = [
+            {
+                "id": "thermostat-{}".format(idx),
+                "description": "Thermostat {}".format(idx),
+                "ambientTemp": 70,
+                "humidityLevel": 40,
+            }
+            for idx in range(thermostats)
+        ]
+
+    @property
+    def device_count(self) -> int:
+        """Number of devices, the panel included."""
+        return 1 + len(self.sensors) + len(self.garage_doors) + len(self.thermostats)
+
+    def mutate(self, fraction: float) -> int:
+        """Change the state of a random fraction of the sensors and thermostats."""
+        changed = 0
+        for sensor in self.sensors:
+            if self._random.random() < fraction:
+                sensor["state"] = 1 if sensor["state"] != 1 else 2
+                changed += 1
+        for thermostat in self.thermostats:
+            if self._random.random() < fraction:
+                thermostat["ambientTemp"] += self._random.choice((-1, 1))
+                changed += 1
+        return changed
+
+
+class MockAlarmdotcomClient:
+    """Drop-in replacement for AlarmdotcomClient serving a SyntheticAccount."""
+
+    def __init__(self, account: SyntheticAccount, latency: float = 0.0) -> None:
+        """Initialize the client."""
+        self.account = account
+        self.latency = latency
+        self.requests: Counter[str] = Counter()
+
+    async def _async_request(self, endpoint: str) -> None:
+        """Count a request and wait for the simulated round-trip."""
+        self.requests[endpoint] += 1
+        await asyncio.sleep(self.latency)
+
+    async def async_login(self) -> None:
+        """Log in."""
+        await self._async_request("login")
+
+    async def async_get_alarm_data(self) -> dict[str, Any]:
+        """Return panel data."""
+        await self._async_request("alarm")
+        return dict(self.account.alarm)
+
+    async def async_get_sensors_data(self) -> list[dict[str, Any]]:
+        """Return sensor data."""
+        await self._async_request("sensors")
+        return [dict(sensor) for sensor in self.account.sensors]
+
+    async def async_get_garage_doors_data(self) -> list[dict[str, Any]]:
+        """Return garage door data."""
+        await self._async_request("garage_doors")
+        return [dict(garage_door) for garage_door in self.account.garage_doors]
+
+    async def async_get_thermostats_data(self) -> list[dict[str, Any]]:
+        """Return thermostat data."""
+        await self._async_request("thermostats")
+        return [dict(thermostat) for thermostat in self.account.thermostats]
+
+    async def async_alarm_disarm(self) -> None:
+        """Disarm the panel."""
+        await self._async_request("disarm")
+        self.account.alarm["state"] = AlarmdotcomClient.ALARM_STATE_DISARMED
+
+    async def async_alarm_arm_stay(self) -> None:
+        """Arm the panel in stay mode."""
+        await self._async_request("arm_stay")
+        self.account.alarm["state"] = AlarmdotcomClient.ALARM_STATE_ARMED_STAY
+
+    async def async_alarm_arm_away(self) -> None:
+        """Arm the panel in away mode."""
+        await self._async_request("arm_away")
+        self.account.alarm["state"] = AlarmdotcomClient.ALARM_STATE_ARMED_AWAY
+
+    async def async_open_garage_door(self, device_id: str) -> None:
+        """Open a garage door."""
+        await self._async_set_garage_door(
+            "open_garage_door", device_id, AlarmdotcomClient.GARAGE_DOOR_STATE_OPEN
+        )
+
+    async def async_close_garage_door(self, device_id: str) -> None:
+        """Close a garage door."""
+        await self._async_set_garage_door(
+            "close_garage_door", device_id, AlarmdotcomClient.GARAGE_DOOR_STATE_CLOSED
+        )
+
+    async def _async_set_garage_door(
+        self, endpoint: str, device_id: str, state: int
+    ) -> None:
+        """Set the state of a garage door."""
+        await self._async_request(endpoint)
+        for garage_door in self.account.garage_doors:
+            if garage_door["id"] == device_id:
+                garage_door["state"] = state
+
+
+class MockAlarmdotcomServer:
+    """Local stand-in for the Alarm.com web API and live event feed.
+
+    Serves the account's system with all devices included, answering
+    If-None-Match with 304 while the account is unchanged. Pass ``url`` as
+    the web_url of AlarmdotcomApi and ``stream_url`` as the stream_url
+    option, then push events with async_send_event.
+
+    The server runs in the benchmark's own process, ``cpu_time`` is the CPU
+    time its handlers spent building responses, so it can be told apart
+    from the client's.
+    """
+
+    def __init__(
+        self,
+        account: SyntheticAccount,
+        latency: float = 0.0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        """Initialize the server."""
+        self.account = account
+        self.latency = latency
+        self.requests: Counter[str] = Counter()
+        self.cpu_time = 0.0
+        self._host = host
+        self._port = port
+        self._runner: web.AppRunner | None = None
+        self._websockets: set[web.WebSocketResponse] = set()
+        self.url: str | None = None
+        self.stream_url: str | None = None
+
+    @property
+    def clients(self) -> int:
+        """Number of connected clients."""
+        return len(self._websockets)
+
+    async def async_start(self) -> None:
+        """Start serving."""
+        app = web.Application()
+        app.router.add_get("/web/api/identities", self._async_handle_identities)
+        app.router.add_get(
+            "/web/api/systems/systems/{system_id}", self._async_handle_system
+        )
+        app.router.add_get("/ws", self._async_handle_websocket)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self._host, self._port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = "http://{}:{}".format(self._host, port)
+        self.stream_url = "ws://{}:{}/ws".format(self._host, port)
+
+    async def async_stop(self) -> None:
+        """Stop serving and drop all clients."""
+        for websocket in list(self._websockets):
+            await websocket.close()
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    async def async_send_event(self, device_id: str, event_type: int) -> None:
+        """Push an event about a device to every connected client."""
+        unit_id, _, device = device_id.partition("-")
+        event = {"UnitId": unit_id, "DeviceId": device, "EventType": event_type}
+        for websocket in list(self._websockets):
+            await websocket.send_json(event)
+
+    async def _async_handle_identities(self, request: web.Request):
+        """Answer with the account's only system."""
+        self.requests["identities"] += 1
+        await asyncio.sleep(self.latency)
+        return web.json_response(
+            {
+                "data": [
+                    {
+                        "relationships": {
+                            "selectedSystem": {"data": {"id": "system-1"}}
+                        }
+                    }
+                ]
+            }
+        )
+
+    async def _async_handle_system(self, request: web.Request):
+        """Answer with the system and all its devices, or 304 if unchanged."""
+        self.requests["account"] += 1
+        await asyncio.sleep(self.latency)
+        cpu_start = time.process_time()
+        try:
+            return self._system_response(request)
+        finally:
+            self.cpu_time += time.process_time() - cpu_start
+
+    def _system_response(self, request: web.Request) -> web.Response:
+        """Build the system response."""
+        included = [
+            _resource(device_type, device)
+            for device_type, devices in (
+                ("devices/partition", [self.account.alarm]),
+                ("devices/sensor", self.account.sensors),
+                ("devices/garage-door", self.account.garage_doors),
+                ("devices/thermostat", self.account.thermostats),
+            )
+            for device in devices
+        ]
+        body = json.dumps(
+            {"data": {"id": request.match_info["system_id"]}, "included": included}
+        ).encode()
+        etag = '"{}"'.format(hashlib.blake2b(body, digest_size=16).hexdigest())
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+        return web.Response(
+            body=body, content_type="application/json", headers={"ETag": etag}
+        )
+
+    async def _async_handle_websocket(self, request: web.Request):
+        """Keep a client connected until it or the server closes."""
+        websocket = web.WebSocketResponse()
+        await websocket.prepare(request)
+        self._websockets.add(websocket)
+        try:
+            async for _ in websocket:
+                pass
+        finally:
+            self._websockets.discard(websocket)
+        return websocket
+
+
+def _resource(device_type: str, device: dict[str, Any]) -> dict[str, Any]:
+    """Return a device as a JSON:API resource."""
+    attributes = {key: value for key, value in device.items() if key != "id"}
+    return {"type": device_type, "id": device["id"], "attributes": attributes}
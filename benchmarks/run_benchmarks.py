@@ -0,0 +1,263 @@
+"""End-to-end performance benchmark of the Alarm.com Redux platforms.
+
+Runs the real coordinator and platforms inside a bare Home Assistant core
+against MockAlarmdotcomClient and MockAlarmdotcomServer and reports, for
+every account size:
+
+  setup        seconds from coordinator creation to all entities added
+  req/cycle    Alarm.com requests per refresh
+  cpu/refresh  CPU milliseconds per refresh, simulated latency and the
+               response building of MockAlarmdotcomServer excluded
+  writes       state writes per refresh, quiet and with --change-rate changes
+  push         milliseconds from an event on MockAlarmdotcomServer to the
+               state write of its entity
+
+Usage: python benchmarks/run_benchmarks.py [--devices 10 100 500 2000]
+Needs homeassistant and pyalarmdotcomredux installed.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+from aiohttp import ClientSession, CookieJar
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from homeassistant import config_entries, core  # noqa: E402
+from homeassistant.helpers import device_registry as dr  # noqa: E402
+from homeassistant.helpers import entity_registry as er  # noqa: E402
+from homeassistant.helpers.entity_platform import EntityPlatform  # noqa: E402
+
+from custom_components.alarmdotcomredux import PLATFORMS  # noqa: E402
+from custom_components.alarmdotcomredux.api import AlarmdotcomApi  # noqa: E402
+from custom_components.alarmdotcomredux.const import (  # noqa: E402
+    DATA_KEYS,
+    DATA_SENSORS,
+    DOMAIN,
+)
+from custom_components.alarmdotcomredux.coordinator import (  # noqa: E402
+    AlarmdotcomDataUpdateCoordinator,
+)
+from custom_components.alarmdotcomredux.metrics import (  # noqa: E402
+    payload_trace_config,
+)
+from custom_components.alarmdotcomredux.polling import PollPhase  # noqa: E402
+from custom_components.alarmdotcomredux.stream import (  # noqa: E402
+    EVENT_CLOSED,
+    EVENT_OPENED,
+    AlarmdotcomEventStream,
+)
+from mock_alarmdotcom import (  # noqa: E402
+    MockAlarmdotcomClient,
+    MockAlarmdotcomServer,
+    SyntheticAccount,
+)
+
+# Keep scheduled polls out of the measurements, refreshes are driven by hand
+NO_POLLING = timedelta(hours=1)
+
+
+async def async_benchmark(
+    devices: int, latency: float, cycles: int, change_rate: float
+) -> dict[str, float]:
+    """Benchmark one account size."""
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = core.HomeAssistant()
+        hass.config.config_dir = config_dir
+        await asyncio.gather(dr.async_load(hass), er.async_load(hass))
+
+        state_writes = 0
+        async_set = hass.states.async_set
+
+        def counting_async_set(*args, **kwargs):
+            nonlocal state_writes
+            state_writes += 1
+            return async_set(*args, **kwargs)
+
+        hass.states.async_set = counting_async_set
+
+        account = SyntheticAccount(devices)
+        client = MockAlarmdotcomClient(account, latency)
+        server = MockAlarmdotcomServer(account, latency)
+        await server.async_start()
+        # Set up like an entry's session, see async_setup_entry
+        session = ClientSession(
+            cookie_jar=CookieJar(), trace_configs=[payload_trace_config()]
+        )
+        entry = config_entries.ConfigEntry(
+            version=1, domain=DOMAIN, title="Benchmark", data={}, source="user"
+        )
+
+        setup_start = time.perf_counter()
+        coordinator = AlarmdotcomDataUpdateCoordinator(
+            hass,
+            AlarmdotcomApi(client, session, server.url),
+            NO_POLLING,
+            NO_POLLING,
+            poll_phase=PollPhase(0),
+            tiers=dict.fromkeys(DATA_KEYS, NO_POLLING),
+        )
+        await coordinator.async_refresh()
+        hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
+        entity_platforms = []
+        for platform_name in PLATFORMS:
+            platform = __import__(
+                "custom_components.alarmdotcomredux." + platform_name,
+                fromlist=["async_setup_entry"],
+            )
+            entity_platform = EntityPlatform(
+                hass=hass,
+                logger=logging.getLogger(platform_name),
+                domain=platform_name,
+                platform_name=DOMAIN,
+                platform=platform,
+                scan_interval=NO_POLLING,
+                entity_namespace=None,
+            )
+            entity_platform.config_entry = entry
+            entity_platforms.append(entity_platform)
+        await asyncio.gather(
+            *(
+                entity_platform.platform.async_setup_entry(
+                    hass, entry, entity_platform._async_schedule_add_entities
+                )
+                for entity_platform in entity_platforms
+            )
+        )
+        await hass.async_block_till_done()
+        setup_time = time.perf_counter() - setup_start
+        entities = len(hass.states.async_all())
+
+        def total_requests() -> int:
+            """Return the requests so far, through the client and the session."""
+            return sum(client.requests.values()) + sum(server.requests.values())
+
+        async def async_measure(fraction: float) -> tuple[float, float, float]:
+            """Return requests, CPU ms and state writes per refresh."""
+            nonlocal state_writes
+            requests = total_requests()
+            state_writes = 0
+            cpu_time = 0.0
+            for _ in range(cycles):
+                account.mutate(fraction)
+                # Refreshes come faster than COALESCE_TTL, do not measure its cache
+                for data_key in DATA_KEYS:
+                    coordinator.api.invalidate(data_key)
+                # The server shares the process, leave its work out
+                server_cpu_start = server.cpu_time
+                cpu_start = time.process_time()
+                await coordinator.async_refresh()
+                await hass.async_block_till_done()
+                cpu_time += (time.process_time() - cpu_start) - (
+                    server.cpu_time - server_cpu_start
+                )
+            return (
+                (total_requests() - requests) / cycles,
+                cpu_time * 1000 / cycles,
+                state_writes / cycles,
+            )
+
+        requests, quiet_cpu, quiet_writes = await async_measure(0)
+        _, busy_cpu, busy_writes = await async_measure(change_rate)
+
+        stream = AlarmdotcomEventStream(hass, session, coordinator, server.stream_url)
+        stream.async_start()
+        while not coordinator.push_connected:
+            await asyncio.sleep(0.01)
+        # The server only pushes to clients it accepted already
+        while not server.clients:
+            await asyncio.sleep(0.01)
+
+        push_time = 0.0
+        sensor_ids = list(coordinator.data[DATA_SENSORS])
+        for cycle in range(cycles):
+            device_id = sensor_ids[cycle % len(sensor_ids)]
+            device = coordinator.data[DATA_SENSORS][device_id]
+            state_writes = 0
+            push_start = time.perf_counter()
+            await server.async_send_event(
+                device_id, EVENT_CLOSED if device.is_on else EVENT_OPENED
+            )
+            while not state_writes:
+                await asyncio.sleep(0)
+            push_time += time.perf_counter() - push_start
+
+        # Stopping the stream asks for a refresh, let it finish and stop
+        # polling before the session goes away
+        stream.async_stop()
+        for entity_platform in entity_platforms:
+            await entity_platform.async_reset()
+        await hass.async_block_till_done()
+        coordinator.async_stop()
+        await session.close()
+        await server.async_stop()
+        await hass.async_stop(force=True)
+
+    return {
+        "devices": account.device_count,
+        "entities": entities,
+        "setup": setup_time,
+        "requests": requests,
+        "quiet_cpu": quiet_cpu,
+        "quiet_writes": quiet_writes,
+        "busy_cpu": busy_cpu,
+        "busy_writes": busy_writes,
+        "push": push_time * 1000 / cycles,
+    }
+
+
+async def async_main(args: argparse.Namespace) -> None:
+    """Run the benchmark for every account size and print a report."""
+    print(
+        "{:>8} {:>8} {:>9} {:>9} {:>11} {:>8} {:>11} {:>8} {:>10}".format(
+            "devices",
+            "entities",
+            "setup s",
+            "req/cycle",
+            "quiet cpu",
+            "writes",
+            "busy cpu",
+            "writes",
+            "push",
+        )
+    )
+    for devices in args.devices:
+        result = await async_benchmark(
+            devices, args.latency, args.cycles, args.change_rate
+        )
+        print(
+            "{devices:>8} {entities:>8} {setup:>9.3f} {requests:>9.1f} "
+            "{quiet_cpu:>8.2f} ms {quiet_writes:>8.1f} "
+            "{busy_cpu:>8.2f} ms {busy_writes:>8.1f} {push:>7.2f} ms".format(**result)
+        )
+
+
+def main() -> None:
+    """Parse arguments and run."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--devices", type=int, nargs="+", default=[10, 100, 500, 1000, 2000]
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.2, help="simulated seconds per request"
+    )
+    parser.add_argument("--cycles", type=int, default=20, help="refreshes per size")
+    parser.add_argument(
+        "--change-rate",
+        type=float,
+        default=0.01,
+        help="fraction of devices changed per busy refresh",
+    )
+    asyncio.run(async_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,51 @@
 """The Alarm.com Redux integration."""
 from __future__ import annotations
+import asyncio
+from collections.abc import Mapping
+from datetime import timedelta
 import logging
+from typing import Any
+
+from aiohttp import CookieJar
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryAuthFailed, ConfigEntryNotReady
 
-from .const import DOMAIN
+from .const import (
+    CONF_ACTIVITY_FEED,
+    CONF_DEDICATED_SESSION,
+    CONF_EVENT_STREAM,
+    CONF_MAX_CONCURRENCY,
+    CONF_MAX_SCAN_INTERVAL,
+    CONF_MIN_SCAN_INTERVAL,
+    CONF_POLL_TIERS,
+    CONF_READ_DEADLINE,
+    CONF_TIMEOUT,
+    DEFAULT_ACTIVITY_FEED,
+    DEFAULT_DEDICATED_SESSION,
+    DEFAULT_EVENT_STREAM,
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    DEFAULT_MIN_SCAN_INTERVAL,
+    DEFAULT_POLL_TIERS,
+    DEFAULT_TIMEOUT,
+    DATA_POLL_PHASES,
+    DATA_RUNTIMES,
+    POOL_HEADROOM,
+    DOMAIN,
+)
+from .activity import async_remove_cursor
+from .api import AlarmdotcomApi
+from .coordinator import AlarmdotcomDataUpdateCoordinator
+from .metrics import payload_trace_config
+from .polling import PollPhases
+from .session import SessionStore, async_create_dedicated_session
+from .runtime import AlarmdotcomEntryRuntime
+from .snapshot import SnapshotStore
 
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.aiohttp_client import async_create_clientsession
 
 from pyalarmdotcomredux import AlarmdotcomClient
 
@@ -18,24 +56,174 @@ _LOGGER = logging.getLogger(__name__)
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Alarm.com from a config entry."""
+    dedicated = entry.options.get(CONF_DEDICATED_SESSION, DEFAULT_DEDICATED_SESSION)
+    pool_size = _pool_size(entry.options)
+    if dedicated:
+        session = async_create_dedicated_session(pool_size)
+    else:
+        # Accounts must not share the cookies their sessions are stored from
+        session = async_create_clientsession(
+            hass,
+            auto_cleanup=False,
+            cookie_jar=CookieJar(),
+            trace_configs=[payload_trace_config()],
+        )
+    runtime = AlarmdotcomEntryRuntime(hass, entry, session, dedicated, pool_size)
+
+    async def _async_shutdown(event: Event) -> None:
+        """Close the session when HA stops."""
+        await runtime.async_close_session()
+
+    entry.async_on_unload(
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, _async_shutdown)
+    )
+    session_store = SessionStore(hass, entry.data.get("username"))
+    snapshot_store = SnapshotStore(hass, entry.entry_id)
+    # Both only touch local storage, load them together
+    session_restored, snapshot = await asyncio.gather(
+        session_store.async_restore(session), snapshot_store.async_load()
+    )
+    if not session_restored:
+        _LOGGER.debug("No stored Alarm.com session, a full login will be needed")
+
     alarm = AlarmdotcomClient(
         entry.data.get("username"),
         entry.data.get("password"),
-        async_get_clientsession(hass),
+        session,
         twofactorcookie=entry.data.get("twofactorcookie"),
     )
-    hass.data[DOMAIN] = {entry.entry_id: alarm}
+    api = AlarmdotcomApi(alarm, session)
+    _async_apply_api_options(api, entry.options)
+    min_interval, max_interval, tiers = _poll_settings(entry.options)
+    poll_phases: PollPhases = hass.data.setdefault(DATA_POLL_PHASES, PollPhases())
+    coordinator = AlarmdotcomDataUpdateCoordinator(
+        hass,
+        api,
+        min_interval=min_interval,
+        max_interval=max_interval,
+        poll_phase=poll_phases.register(entry.entry_id),
+        tiers=tiers,
+    )
+    runtime.coordinator = coordinator
+
+    # This is the only network wait of the whole setup: platforms never fetch
+    # anything themselves, they build their entities from coordinator data
+    if snapshot is not None:
+        # Create entities from the last good data right away and let the
+        # first live refresh run in the background
+        _LOGGER.debug("Starting Alarm.com from stored snapshot")
+        coordinator.async_set_snapshot(snapshot)
+        first_refresh = hass.async_create_task(coordinator.async_refresh())
+        entry.async_on_unload(first_refresh.cancel)
+    else:
+        # Fetch initial data once for all platforms so we have data when
+        # entities subscribe. If the refresh fails, this will raise
+        # ConfigEntryNotReady and setup will try again later.
+        try:
+            await coordinator.async_config_entry_first_refresh()
+        except (ConfigEntryAuthFailed, ConfigEntryNotReady):
+            await runtime.async_close_session()
+            raise
 
+    @callback
+    def _async_save_state() -> None:
+        """Keep the stored session and snapshot current."""
+        if not coordinator.last_update_success:
+            return
+        session_store.async_schedule_save(session)
+        snapshot_store.async_schedule_save(coordinator.data)
+
+    entry.async_on_unload(coordinator.async_add_listener(_async_save_state))
+
+    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
+    hass.data.setdefault(DATA_RUNTIMES, {})[entry.entry_id] = runtime
+
+    # Platforms are set up concurrently, without waiting on each other
     _LOGGER.debug("Setup platforms")
     hass.config_entries.async_setup_platforms(entry, PLATFORMS)
 
+    await runtime.async_set_activity_feed(
+        entry.options.get(CONF_ACTIVITY_FEED, DEFAULT_ACTIVITY_FEED)
+    )
+    runtime.async_set_push(entry.options.get(CONF_EVENT_STREAM, DEFAULT_EVENT_STREAM))
+    entry.async_on_unload(runtime.async_stop)
+
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
+
     return True
 
 
+async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply changed options to the running entry, without reloading it.
+
+    Module-level, as config entries only keep weak references to their
+    update listeners.
+    """
+    runtime: AlarmdotcomEntryRuntime = hass.data[DATA_RUNTIMES][entry.entry_id]
+    if runtime.dedicated != entry.options.get(
+        CONF_DEDICATED_SESSION, DEFAULT_DEDICATED_SESSION
+    ) or (runtime.dedicated and runtime.pool_size != _pool_size(entry.options)):
+        # Every request and the stream hold on to the session, and its pool
+        # cannot be resized
+        hass.async_create_task(hass.config_entries.async_reload(entry.entry_id))
+        return
+    _async_apply_api_options(runtime.coordinator.api, entry.options)
+    runtime.coordinator.async_set_poll_intervals(*_poll_settings(entry.options))
+    runtime.async_set_push(entry.options.get(CONF_EVENT_STREAM, DEFAULT_EVENT_STREAM))
+    await runtime.async_set_activity_feed(
+        entry.options.get(CONF_ACTIVITY_FEED, DEFAULT_ACTIVITY_FEED)
+    )
+    runtime.async_options_updated(entry.options)
+
+
+def _pool_size(options: Mapping[str, Any]) -> int:
+    """Return the connections a dedicated session needs."""
+    return (
+        options.get(CONF_MAX_CONCURRENCY, DEFAULT_MAX_CONCURRENCY) + POOL_HEADROOM
+    )
+
+
+@callback
+def _async_apply_api_options(api: AlarmdotcomApi, options: Mapping[str, Any]) -> None:
+    """Apply the timeout and concurrency options to the API."""
+    api.timeout = options.get(CONF_TIMEOUT, DEFAULT_TIMEOUT)
+    api.read_deadline = options.get(CONF_READ_DEADLINE)
+    api.concurrency.set_limit(
+        options.get(CONF_MAX_CONCURRENCY, DEFAULT_MAX_CONCURRENCY)
+    )
+
+
+def _poll_settings(
+    options: Mapping[str, Any]
+) -> tuple[timedelta, timedelta, dict[str, timedelta]]:
+    """Return the poll interval floor, ceiling and tiers set in the options."""
+    tiers = {**DEFAULT_POLL_TIERS, **options.get(CONF_POLL_TIERS, {})}
+    return (
+        timedelta(
+            seconds=options.get(CONF_MIN_SCAN_INTERVAL, DEFAULT_MIN_SCAN_INTERVAL)
+        ),
+        timedelta(
+            seconds=options.get(CONF_MAX_SCAN_INTERVAL, DEFAULT_MAX_SCAN_INTERVAL)
+        ),
+        {data_key: timedelta(seconds=seconds) for data_key, seconds in tiers.items()},
+    )
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
         hass.data[DOMAIN].pop(entry.entry_id)
+        hass.data[DATA_POLL_PHASES].release(entry.entry_id)
+        runtime = hass.data[DATA_RUNTIMES].pop(entry.entry_id)
+        runtime.async_stop()
+        await runtime.async_close_session()
 
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Forget the stored session, snapshot and activity cursor of an entry."""
+    await SessionStore(hass, entry.data.get("username")).async_remove()
+    await SnapshotStore(hass, entry.entry_id).async_remove()
+    await async_remove_cursor(hass, entry.entry_id)
@@ -0,0 +1,198 @@
+"""Replay of the Alarm.com activity history."""
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime
+import logging
+from typing import Any
+
+from aiohttp import ClientError, ClientResponseError
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+import homeassistant.util.dt as dt_util
+
+from .api import SESSION_EXPIRED_STATUSES, UNSUPPORTED_STATUSES
+from .const import ACTIVITY_MAX_REPLAY, DOMAIN
+from .coordinator import AlarmdotcomDataUpdateCoordinator
+from .stream import async_apply_event
+
+from pyalarmdotcomredux import AlarmdotcomClientError
+
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 60
+
+
+class AlarmdotcomActivityFeed:
+    """Replay device events that happened between two polls.
+
+    After every poll, the activity history since a persisted cursor is
+    fetched and its events are applied in order, so a door opened and closed
+    within one poll interval still shows up in the entity's history. Every
+    replayed device then ends at its latest known state.
+
+    While the event stream is connected, it already delivers every event and
+    the cursor just moves along.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        coordinator: AlarmdotcomDataUpdateCoordinator,
+        entry_id: str,
+    ) -> None:
+        """Initialize the feed."""
+        self._hass = hass
+        self._coordinator = coordinator
+        self._store = _cursor_store(hass, entry_id)
+        # Events up to since are applied, as well as those at since in seen
+        self._since: datetime | None = None
+        self._seen: set[str] = set()
+        self._polls = coordinator.polls
+        self._task: asyncio.Task | None = None
+        self._enabled = True
+
+    async def async_load(self) -> None:
+        """Restore the stored cursor, if any."""
+        stored = await self._store.async_load()
+        if stored:
+            self._since = dt_util.parse_datetime(stored["since"])
+            self._seen = set(stored["seen"])
+
+    @callback
+    def async_start(self) -> CALLBACK_TYPE:
+        """Catch up after every poll. Returns a function to stop."""
+        remove_listener = self._coordinator.async_add_listener(self._async_poll_done)
+
+        @callback
+        def stop() -> None:
+            """Stop catching up."""
+            remove_listener()
+            if self._task is not None:
+                self._task.cancel()
+
+        return stop
+
+    @callback
+    def _async_poll_done(self) -> None:
+        """Catch up on the activity history after a poll."""
+        if self._coordinator.polls == self._polls:
+            # Not a poll, e.g. a command confirmation
+            return
+        self._polls = self._coordinator.polls
+        if not self._enabled or (self._task is not None and not self._task.done()):
+            return
+        if self._coordinator.push_connected:
+            self._async_advance(dt_util.utcnow(), set())
+            return
+        self._task = self._hass.async_create_task(self._async_catch_up())
+
+    async def _async_catch_up(self) -> None:
+        """Fetch the events since the cursor and replay them in order."""
+        now = dt_util.utcnow()
+        if self._since is None:
+            # Nothing to catch up on before the first poll
+            self._async_advance(now, set())
+            return
+        # Transitions from long ago only clutter the history
+        since = max(self._since, now - ACTIVITY_MAX_REPLAY)
+
+        try:
+            resources = await self._coordinator.api.async_fetch_activity(since)
+            events = sorted(
+                (
+                    event
+                    for event in map(_as_live_event, resources)
+                    if event[0] > since
+                    or (event[0] == since and event[1] not in self._seen)
+                ),
+                key=lambda event: event[0],
+            )
+        except ClientResponseError as err:
+            if err.status in UNSUPPORTED_STATUSES:
+                self._async_disable(err)
+            elif err.status in SESSION_EXPIRED_STATUSES:
+                _LOGGER.debug("Alarm.com session expired, catching up next poll")
+            else:
+                _LOGGER.debug("Fetching Alarm.com activity failed: %s", err)
+            return
+        except (KeyError, TypeError, ValueError) as err:
+            self._async_disable(err)
+            return
+        except (asyncio.TimeoutError, ClientError, AlarmdotcomClientError) as err:
+            _LOGGER.debug("Fetching Alarm.com activity failed: %s", err)
+            return
+
+        if not events:
+            return
+        _LOGGER.debug("Replaying %s Alarm.com events", len(events))
+        latest = {}
+        for _, _, event in events:
+            device_id = "{}-{}".format(event["UnitId"], event["DeviceId"])
+            if device_id not in latest:
+                latest[device_id] = self._coordinator.async_get_device(device_id)
+            async_apply_event(self._coordinator, event, refresh_unknown=False)
+        # Replayed events predate the latest data
+        for device_id, device in latest.items():
+            if device is not None:
+                self._coordinator.async_apply_device_state(device_id, device.state)
+
+        last = events[-1][0]
+        self._async_advance(
+            last, {event_id for when, event_id, _ in events if when == last}
+        )
+
+    @callback
+    def _async_advance(self, since: datetime, seen: set[str]) -> None:
+        """Move the cursor and store it in a while."""
+        if since == self._since:
+            seen |= self._seen
+        self._since = since
+        self._seen = seen
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    @callback
+    def _async_disable(self, err: Exception) -> None:
+        """Stop catching up for good."""
+        _LOGGER.info(
+            "Alarm.com activity history is not available (%s), "
+            "short transitions between polls will be missed",
+            err,
+        )
+        self._enabled = False
+
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the cursor to store."""
+        return {"since": self._since.isoformat(), "seen": sorted(self._seen)}
+
+
+async def async_remove_cursor(hass: HomeAssistant, entry_id: str) -> None:
+    """Forget the stored cursor of a config entry."""
+    await _cursor_store(hass, entry_id).async_remove()
+
+
+def _cursor_store(hass: HomeAssistant, entry_id: str) -> Store:
+    """Return the store of the cursor of a config entry."""
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.activity.{entry_id}")
+
+
+def _as_live_event(resource: dict[str, Any]) -> tuple[datetime, str, dict[str, Any]]:
+    """Convert an activity resource to the live feed event format."""
+    attributes = resource["attributes"]
+    when = dt_util.parse_datetime(attributes["eventDateUtc"])
+    if when is None:
+        raise ValueError(f"Invalid event date {attributes['eventDateUtc']}")
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=dt_util.UTC)
+    return (
+        dt_util.as_utc(when),
+        str(resource["id"]),
+        {
+            "UnitId": attributes["unitId"],
+            "DeviceId": attributes["deviceId"],
+            "EventType": attributes["eventType"],
+        },
+    )
@@ -1,7 +1,10 @@
 """ Alarm Control Panel platform for Alarm.com """
 
+import asyncio
 import logging
 
+from aiohttp import ClientError
+
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 
@@ -11,7 +14,9 @@ from homeassistant.const import (
     STATE_ALARM_ARMED_AWAY,
     STATE_ALARM_ARMED_HOME,
     STATE_ALARM_ARMED_NIGHT,
+    STATE_ALARM_ARMING,
     STATE_ALARM_DISARMED,
+    STATE_ALARM_DISARMING,
 )
 
 from homeassistant.components.alarm_control_panel import (
@@ -23,7 +28,9 @@ from homeassistant.components.alarm_control_panel.const import (
     SUPPORT_ALARM_ARM_HOME,
 )
 
-from .const import DOMAIN
+from .const import DATA_ALARM, DOMAIN
+from .coordinator import AlarmdotcomDataUpdateCoordinator
+from .entity import AlarmdotcomEntity, async_setup_device_entities
 
 from pyalarmdotcomredux import AlarmdotcomClient, AlarmdotcomClientError
 
@@ -35,17 +42,24 @@ async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities
 ) -> bool:
     """Setup entities"""
-    alarm_client = hass.data[DOMAIN][entry.entry_id]
+    coordinator: AlarmdotcomDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
 
-    entity = AlarmEntity(alarm_client, entry.data.get("code"))
-    _LOGGER.debug("Triggering first Alarm.com panel update")
-    await entity.async_update()
-    async_add_entities([entity])
+    async_setup_device_entities(
+        entry,
+        coordinator,
+        DATA_ALARM,
+        lambda device_id: [
+            AlarmEntity(coordinator, device_id, entry.data.get("code"))
+        ],
+        async_add_entities,
+    )
 
 
-class AlarmEntity(AlarmControlPanelEntity):
+class AlarmEntity(AlarmdotcomEntity, AlarmControlPanelEntity):
     """Representation of an Alarm.com-based alarm panel."""
 
+    _data_key = DATA_ALARM
+
     _attr_code_format = FORMAT_NUMBER
     _attr_supported_features = SUPPORT_ALARM_ARM_HOME | SUPPORT_ALARM_ARM_AWAY
 
@@ -56,28 +70,37 @@ class AlarmEntity(AlarmControlPanelEntity):
         AlarmdotcomClient.ALARM_STATE_ARMED_NIGHT: STATE_ALARM_ARMED_NIGHT,
     }
 
-    def __init__(self, alarm_client: AlarmdotcomClient, code: str) -> None:
-        self._alarm_client = alarm_client
+    def __init__(
+        self,
+        coordinator: AlarmdotcomDataUpdateCoordinator,
+        device_id: str,
+        code: str,
+    ) -> None:
+        """Initialize the entity."""
+        super().__init__(coordinator, device_id)
         self._code = code
 
-    async def async_update(self) -> None:
-        """Trigger update"""
-        alarm_data = await self._alarm_client.async_get_alarm_data()
-        _LOGGER.debug(
-            "Updated Alarm.com alarm data for '%s' (id %s)",
-            alarm_data["description"],
-            alarm_data["id"],
-        )
-        self._attr_unique_id = alarm_data["id"]
-        self._attr_name = alarm_data["description"]
-        self._attr_state = self.STATE_MAPPING[alarm_data["state"]]
+    @property
+    def state(self):
+        """Return the state of the alarm panel."""
+        pending_state = self.coordinator.pending_state(DATA_ALARM, self._device_id)
+        if pending_state == AlarmdotcomClient.ALARM_STATE_DISARMED:
+            return STATE_ALARM_DISARMING
+        if pending_state is not None:
+            return STATE_ALARM_ARMING
+        return self.STATE_MAPPING[self._device.state]
 
     async def async_alarm_disarm(self, code=None) -> None:
         """Send disarm command."""
         if self._validate_code(code):
             try:
-                await self._alarm_client.async_alarm_disarm()
-            except AlarmdotcomClientError as err:
+                await self.coordinator.async_send_command(
+                    DATA_ALARM,
+                    self._device_id,
+                    AlarmdotcomClient.ALARM_STATE_DISARMED,
+                    "alarm_disarm",
+                )
+            except (asyncio.TimeoutError, AlarmdotcomClientError, ClientError) as err:
                 raise HomeAssistantError(
                     "Disarming {alarm_name} failed with error: {err}".format(
                         alarm_name=self.name,
@@ -89,8 +112,13 @@ class AlarmEntity(AlarmControlPanelEntity):
         """Send arm home command."""
         if self._validate_code(code):
             try:
-                await self._alarm_client.async_alarm_arm_stay()
-            except AlarmdotcomClientError as err:
+                await self.coordinator.async_send_command(
+                    DATA_ALARM,
+                    self._device_id,
+                    AlarmdotcomClient.ALARM_STATE_ARMED_STAY,
+                    "alarm_arm_stay",
+                )
+            except (asyncio.TimeoutError, AlarmdotcomClientError, ClientError) as err:
                 raise HomeAssistantError(
                     "Arming (Home) {alarm_name} failed with error: {err}".format(
                         alarm_name=self.name,
@@ -102,8 +130,13 @@ class AlarmEntity(AlarmControlPanelEntity):
         """Send arm away command."""
         if self._validate_code(code):
             try:
-                await self._alarm_client.async_alarm_arm_away()
-            except AlarmdotcomClientError as err:
+                await self.coordinator.async_send_command(
+                    DATA_ALARM,
+                    self._device_id,
+                    AlarmdotcomClient.ALARM_STATE_ARMED_AWAY,
+                    "alarm_arm_away",
+                )
+            except (asyncio.TimeoutError, AlarmdotcomClientError, ClientError) as err:
                 raise HomeAssistantError(
                     "Arming (Away) {alarm_name} failed with error: {err}".format(
                         alarm_name=self.name,
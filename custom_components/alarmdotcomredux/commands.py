@@ -0,0 +1,82 @@
+"""Command queue for Alarm.com."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+import logging
+from typing import Any
+
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class CommandQueue:
+    """Order the commands of an account and keep polls out of their way.
+
+    Commands on the same target (the panel, or one garage door) run one at a
+    time in submission order, while commands on different targets run
+    concurrently; Alarm.com has no endpoint taking several commands at once.
+    A command submitted again while it is the last one queued on its target
+    shares its result; behind another command it is queued anew, so the
+    target ends in the state asked for last. Polls wait for async_wait_idle,
+    so they never race a command.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the queue."""
+        # The last queued or running command of each target
+        self._last_by_target: dict[Hashable, tuple[Hashable, asyncio.Future]] = {}
+        self._pending = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    @property
+    def pending(self) -> int:
+        """Number of queued or running commands."""
+        return self._pending
+
+    async def async_wait_idle(self) -> None:
+        """Wait until no command is queued or running."""
+        await self._idle.wait()
+
+    async def async_submit(
+        self,
+        target: Hashable,
+        command: Hashable,
+        send: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """Queue a command and return its result once it ran."""
+        last = self._last_by_target.get(target)
+        if last is not None and last[0] == command:
+            _LOGGER.debug("Merging duplicate Alarm.com command %s", command)
+            return await asyncio.shield(last[1])
+
+        queued = asyncio.ensure_future(
+            self._async_run(None if last is None else last[1], send)
+        )
+        queued.add_done_callback(lambda done: self._async_command_done(target, done))
+        self._last_by_target[target] = (command, queued)
+        self._pending += 1
+        self._idle.clear()
+        return await asyncio.shield(queued)
+
+    async def _async_run(
+        self, previous: asyncio.Future | None, send: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Run a command once the previous one on its target is done."""
+        if previous is not None:
+            # Its outcome belongs to its own callers
+            await asyncio.wait([previous])
+        return await send()
+
+    def _async_command_done(self, target: Hashable, done: asyncio.Future) -> None:
+        """Forget a finished command."""
+        if not done.cancelled():
+            # Keep errors nobody waits for anymore out of the log
+            done.exception()
+        last = self._last_by_target.get(target)
+        if last is not None and last[1] is done:
+            del self._last_by_target[target]
+        self._pending -= 1
+        if not self._pending:
+            self._idle.set()
@@ -4,16 +4,42 @@ from __future__ import annotations
 import logging
 from typing import Any
 
+from aiohttp import CookieJar
 import voluptuous as vol
 
 from homeassistant import config_entries
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.exceptions import HomeAssistantError
 
-from .const import DOMAIN
+from .const import (
+    CONF_ACTIVITY_FEED,
+    CONF_DEDICATED_SESSION,
+    CONF_EVENT_STREAM,
+    CONF_MAX_CONCURRENCY,
+    CONF_MAX_SCAN_INTERVAL,
+    CONF_MIN_SCAN_INTERVAL,
+    CONF_POLL_TIERS,
+    CONF_READ_DEADLINE,
+    CONF_SENSOR_FILTER,
+    CONF_SENSOR_FILTERS,
+    CONF_TIER_SCAN_INTERVAL,
+    CONF_TIMEOUT,
+    DATA_KEYS,
+    DEFAULT_ACTIVITY_FEED,
+    DEFAULT_DEDICATED_SESSION,
+    DEFAULT_EVENT_STREAM,
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    DEFAULT_MIN_SCAN_INTERVAL,
+    DEFAULT_POLL_TIERS,
+    DEFAULT_SENSOR_FILTERS,
+    DEFAULT_TIMEOUT,
+    DOMAIN,
+)
+from .session import SessionStore
 
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.aiohttp_client import async_create_clientsession
 from pyalarmdotcomredux import (
     AlarmdotcomClient,
     AlarmdotcomClientAuthError,
@@ -31,25 +57,41 @@ STEP_USER_DATA_SCHEMA = vol.Schema(
     }
 )
 
+STEP_REAUTH_DATA_SCHEMA = vol.Schema(
+    {
+        vol.Required("password"): str,
+        vol.Optional("twofactorcookie"): str,
+    }
+)
+
 
 async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
     """Validate the user input allows us to connect.
 
     Data has the keys from STEP_USER_DATA_SCHEMA with values provided by the user.
     """
+    # The stored cookies must be this account's only
+    session = async_create_clientsession(
+        hass, auto_cleanup=False, cookie_jar=CookieJar()
+    )
     alarm_client = AlarmdotcomClient(
         data.get("username"),
         data.get("password"),
-        async_get_clientsession(hass),
+        session,
         twofactorcookie=data.get("twofactorcookie"),
     )
 
     try:
         await alarm_client.async_login()
+        # Keep the fresh session so setup does not have to log in again
+        await SessionStore(hass, data.get("username")).async_save(session)
     except (AlarmdotcomClientAuthError) as err:
         raise InvalidAuth from err
     except (AlarmdotcomClientError) as err:
         raise CannotConnect from err
+    finally:
+        # The session shares the connector of HA's own, which must stay open
+        session.detach()
 
     # If you cannot connect:
     # throw CannotConnect
@@ -65,6 +107,16 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    _reauth_entry: config_entries.ConfigEntry | None = None
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> OptionsFlowHandler:
+        """Get the options flow for this handler."""
+        return OptionsFlowHandler(config_entry)
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
@@ -92,6 +144,173 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             step_id="user", data_schema=STEP_USER_DATA_SCHEMA, errors=errors
         )
 
+    async def async_step_reauth(self, data: dict[str, Any]) -> FlowResult:
+        """Handle credentials Alarm.com no longer accepts.
+
+        Expired sessions never get here, the API logs in again on its own.
+        """
+        self._reauth_entry = self.hass.config_entries.async_get_entry(
+            self.context["entry_id"]
+        )
+        return await self.async_step_reauth_confirm()
+
+    async def async_step_reauth_confirm(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Ask for new credentials and hand them to the running entry."""
+        entry = self._reauth_entry
+        errors = {}
+
+        if user_input is not None:
+            data = {**entry.data, **user_input}
+            try:
+                await validate_input(self.hass, data)
+            except CannotConnect:
+                errors["base"] = "cannot_connect"
+            except InvalidAuth:
+                errors["base"] = "invalid_auth"
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Unexpected exception")
+                errors["base"] = "unknown"
+            else:
+                self.hass.config_entries.async_update_entry(entry, data=data)
+                coordinator = self.hass.data.get(DOMAIN, {}).get(entry.entry_id)
+                if coordinator is None:
+                    # Setup itself failed to log in
+                    self.hass.async_create_task(
+                        self.hass.config_entries.async_reload(entry.entry_id)
+                    )
+                else:
+                    # Swap the client under the running entities, and resume
+                    # the polling the authentication failure stopped
+                    coordinator.api.update_credentials(
+                        data.get("username"),
+                        data.get("password"),
+                        data.get("twofactorcookie"),
+                    )
+                    self.hass.async_create_task(coordinator.async_refresh())
+                return self.async_abort(reason="reauth_successful")
+
+        return self.async_show_form(
+            step_id="reauth_confirm",
+            data_schema=STEP_REAUTH_DATA_SCHEMA,
+            errors=errors,
+            description_placeholders={"username": entry.data.get("username")},
+        )
+
+
+class OptionsFlowHandler(config_entries.OptionsFlow):
+    """Tune polling, timeouts, reading filters, replay and push for an account.
+
+    The running entry applies new options right away, without a reload.
+    """
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize the options flow."""
+        self.config_entry = config_entry
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the options."""
+        options = self.config_entry.options
+        errors = {}
+
+        if user_input is not None:
+            if user_input[CONF_MIN_SCAN_INTERVAL] > user_input[CONF_MAX_SCAN_INTERVAL]:
+                errors["base"] = "invalid_interval"
+            else:
+                tiers = {
+                    data_key: user_input.pop(CONF_TIER_SCAN_INTERVAL.format(data_key))
+                    for data_key in DATA_KEYS
+                }
+                sensor_filters = {
+                    sensor: {
+                        option: user_input.pop(
+                            CONF_SENSOR_FILTER.format(sensor, option)
+                        )
+                        for option in settings
+                    }
+                    for sensor, settings in DEFAULT_SENSOR_FILTERS.items()
+                }
+                # Options not in the form, e.g. stream_url, are kept
+                return self.async_create_entry(
+                    title="",
+                    data={
+                        **{
+                            key: value
+                            for key, value in options.items()
+                            if key != CONF_READ_DEADLINE
+                        },
+                        **user_input,
+                        CONF_POLL_TIERS: tiers,
+                        CONF_SENSOR_FILTERS: sensor_filters,
+                    },
+                )
+
+        tiers = {**DEFAULT_POLL_TIERS, **options.get(CONF_POLL_TIERS, {})}
+        sensor_filters = {
+            sensor: {**settings, **options.get(CONF_SENSOR_FILTERS, {}).get(sensor, {})}
+            for sensor, settings in DEFAULT_SENSOR_FILTERS.items()
+        }
+        interval = vol.All(vol.Coerce(int), vol.Range(min=1, max=3600))
+        filter_validators = {
+            CONF_DEADBAND: vol.All(vol.Coerce(float), vol.Range(min=0)),
+            CONF_DEADBAND_PERCENT: bool,
+            CONF_MIN_INTERVAL: vol.All(vol.Coerce(int), vol.Range(min=0, max=3600)),
+        }
+        schema = {
+            vol.Required(
+                CONF_MIN_SCAN_INTERVAL,
+                default=options.get(CONF_MIN_SCAN_INTERVAL, DEFAULT_MIN_SCAN_INTERVAL),
+            ): interval,
+            vol.Required(
+                CONF_MAX_SCAN_INTERVAL,
+                default=options.get(CONF_MAX_SCAN_INTERVAL, DEFAULT_MAX_SCAN_INTERVAL),
+            ): interval,
+            **{
+                vol.Required(
+                    CONF_TIER_SCAN_INTERVAL.format(data_key), default=tiers[data_key]
+                ): interval
+                for data_key in DATA_KEYS
+            },
+            vol.Required(
+                CONF_TIMEOUT, default=options.get(CONF_TIMEOUT, DEFAULT_TIMEOUT)
+            ): vol.All(vol.Coerce(int), vol.Range(min=1, max=120)),
+            # Left empty, every endpoint keeps its own deadline
+            vol.Optional(
+                CONF_READ_DEADLINE,
+                description={"suggested_value": options.get(CONF_READ_DEADLINE)},
+            ): vol.All(vol.Coerce(int), vol.Range(min=1, max=120)),
+            vol.Required(
+                CONF_MAX_CONCURRENCY,
+                default=options.get(CONF_MAX_CONCURRENCY, DEFAULT_MAX_CONCURRENCY),
+            ): vol.All(vol.Coerce(int), vol.Range(min=1, max=16)),
+            **{
+                vol.Required(
+                    CONF_SENSOR_FILTER.format(sensor, option), default=value
+                ): filter_validators[option]
+                for sensor, settings in sensor_filters.items()
+                for option, value in settings.items()
+            },
+            vol.Required(
+                CONF_ACTIVITY_FEED,
+                default=options.get(CONF_ACTIVITY_FEED, DEFAULT_ACTIVITY_FEED),
+            ): bool,
+            vol.Required(
+                CONF_EVENT_STREAM,
+                default=options.get(CONF_EVENT_STREAM, DEFAULT_EVENT_STREAM),
+            ): bool,
+            # The only option that reloads the entry
+            vol.Required(
+                CONF_DEDICATED_SESSION,
+                default=options.get(CONF_DEDICATED_SESSION, DEFAULT_DEDICATED_SESSION),
+            ): bool,
+        }
+        return self.async_show_form(
+            step_id="init", data_schema=vol.Schema(schema), errors=errors
+        )
+
 
 class CannotConnect(HomeAssistantError):
     """Error to indicate we cannot connect."""
@@ -1,3 +1,125 @@
 """Constants for the Alarm.com integration."""
 
+from datetime import timedelta
+
 DOMAIN = "alarmdotcomredux"
+
+DEFAULT_SCAN_INTERVAL = timedelta(seconds=30)
+DEFAULT_TIMEOUT = 10
+
+DATA_ALARM = "alarm"
+DATA_SENSORS = "sensors"
+DATA_GARAGE_DOORS = "garage_doors"
+DATA_THERMOSTATS = "thermostats"
+DATA_KEYS = (DATA_ALARM, DATA_SENSORS, DATA_GARAGE_DOORS, DATA_THERMOSTATS)
+
+CONF_MIN_SCAN_INTERVAL = "min_scan_interval"
+CONF_MAX_SCAN_INTERVAL = "max_scan_interval"
+
+# Poll interval floor, used right after a command or while a device is moving
+DEFAULT_MIN_SCAN_INTERVAL = 5
+# Poll interval ceiling, reached after a long quiet period
+DEFAULT_MAX_SCAN_INTERVAL = 300
+# How long to keep polling at the floor after a command
+FAST_POLL_WINDOW = timedelta(seconds=60)
+# Growth factor of the poll interval for every quiet refresh
+IDLE_BACKOFF_FACTOR = 1.5
+
+# Base poll interval of each data slice in seconds, see TieredPollSchedule
+CONF_POLL_TIERS = "poll_tiers"
+# Options flow field of the base poll interval of a data slice
+CONF_TIER_SCAN_INTERVAL = "{}_scan_interval"
+DEFAULT_POLL_TIERS = {
+    DATA_ALARM: 10,
+    DATA_SENSORS: 10,
+    DATA_GARAGE_DOORS: 15,
+    DATA_THERMOSTATS: 300,
+}
+# Slices due within this fraction of their interval share an earlier poll
+TIER_FOLD_FACTOR = 0.25
+
+DATA_POLL_PHASES = f"{DOMAIN}_poll_phases"
+# Random spread applied to every idle poll, as a fraction of the interval
+POLL_JITTER = 0.1
+
+ALARMDOTCOM_URL = "https://www.alarm.com"
+
+# Optional session per account, see async_create_dedicated_session
+CONF_DEDICATED_SESSION = "dedicated_session"
+DEFAULT_DEDICATED_SESSION = False
+# The AlarmdotcomEntryRuntime of every loaded config entry
+DATA_RUNTIMES = f"{DOMAIN}_runtimes"
+# Connections beyond the concurrency limit, for commands, logins and the
+# event stream, which the limit does not hold back
+POOL_HEADROOM = 4
+DNS_CACHE_TTL = timedelta(minutes=5)
+KEEPALIVE_TIMEOUT = timedelta(seconds=60)
+ACCOUNT_IDENTITIES_PATH = "/web/api/identities"
+ACCOUNT_SYSTEM_PATH = "/web/api/systems/systems/{}"
+ACTIVITY_PATH = "/web/api/activity/events"
+
+ATTR_STALE = "stale"
+# Polls of its slice a device must be missing from before its entities are
+# removed, it shows as unavailable until then
+DEVICE_REMOVAL_POLLS = 3
+
+# Sustained Alarm.com requests per second and burst size of an account
+THROTTLE_RATE = 1.0
+THROTTLE_BURST = 10
+# Consecutive failures before polls are held back
+CIRCUIT_BREAKER_THRESHOLD = 5
+BACKOFF_BASE = timedelta(seconds=15)
+BACKOFF_MAX = timedelta(minutes=15)
+# Random spread of every backoff, as a fraction of it
+BACKOFF_JITTER = 0.2
+
+# Reads still unanswered at this latency percentile of their endpoint get a
+# second request, once the endpoint has seen enough requests
+HEDGE_PERCENTILE = 0.95
+HEDGE_MIN_REQUESTS = 20
+
+# Seconds a command may take, and every read if set, see AlarmdotcomApi
+CONF_TIMEOUT = "timeout"
+CONF_READ_DEADLINE = "read_deadline"
+# Polls in flight at once for an account
+CONF_MAX_CONCURRENCY = "max_concurrency"
+DEFAULT_MAX_CONCURRENCY = 4
+
+# How long a fetched data slice is shared with later identical reads
+COALESCE_TTL = timedelta(seconds=2)
+# Least time between two refreshes of a slice asked for by the event stream
+EVENT_REFRESH_COOLDOWN = timedelta(seconds=2)
+
+# Filters of the thermostat readings by reading, see DeadbandFilter. The
+# options flow shows them as e.g. "ambientTemp_deadband".
+CONF_SENSOR_FILTERS = "sensor_filters"
+CONF_SENSOR_FILTER = "{}_{}"
+CONF_DEADBAND = "deadband"
+CONF_DEADBAND_PERCENT = "deadband_percent"
+CONF_MIN_INTERVAL = "min_interval"
+DEFAULT_SENSOR_FILTERS = {
+    "ambientTemp": {
+        CONF_DEADBAND: 0.5,
+        CONF_DEADBAND_PERCENT: False,
+        CONF_MIN_INTERVAL: 60,
+    },
+    "humidityLevel": {
+        CONF_DEADBAND: 1,
+        CONF_DEADBAND_PERCENT: False,
+        CONF_MIN_INTERVAL: 60,
+    },
+}
+
+CONF_ACTIVITY_FEED = "activity_feed"
+
+DEFAULT_ACTIVITY_FEED = True
+# Oldest activity replayed after a restart
+ACTIVITY_MAX_REPLAY = timedelta(hours=1)
+
+CONF_EVENT_STREAM = "event_stream"
+CONF_STREAM_URL = "stream_url"
+
+DEFAULT_EVENT_STREAM = False
+STREAM_TOKEN_URL = ALARMDOTCOM_URL + "/web/api/websockets/token"
+STREAM_RECONNECT_MIN = timedelta(seconds=5)
+STREAM_RECONNECT_MAX = timedelta(minutes=5)
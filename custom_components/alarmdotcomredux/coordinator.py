@@ -0,0 +1,526 @@
+"""Data update coordinator for Alarm.com."""
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import replace
+from datetime import timedelta
+from functools import partial
+import logging
+import time
+from typing import Any
+
+from aiohttp import ClientError
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+
+from .const import (
+    DATA_ALARM,
+    DATA_GARAGE_DOORS,
+    DATA_KEYS,
+    DATA_SENSORS,
+    DATA_THERMOSTATS,
+    EVENT_REFRESH_COOLDOWN,
+    FAST_POLL_WINDOW,
+)
+from .api import AlarmdotcomApi
+from .polling import PollPhase, TieredPollSchedule
+
+from pyalarmdotcomredux import AlarmdotcomClientError, AlarmdotcomClientAuthError
+
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class AlarmdotcomDataUpdateCoordinator(DataUpdateCoordinator):
+    """Fetch all Alarm.com data for an account in a single refresh cycle.
+
+    Every platform reads its own slice of ``data``, each one a dict of
+    device records (see models) keyed by Alarm.com device id:
+      DATA_ALARM         panels
+      DATA_SENSORS       contact/motion sensors
+      DATA_GARAGE_DOORS  garage doors
+      DATA_THERMOSTATS   thermostats
+
+    Entities subscribe to their own device with async_add_device_listener and
+    are only called back when that device's data changed since the previous
+    snapshot, or when the coordinator availability changed.
+
+    Each slice is polled on its own tier, see TieredPollSchedule, and only
+    the slices that are due are fetched. Slices without any entity listening
+    are only polled at the interval ceiling, to discover new devices. Idle
+    polls are shifted to the account's own PollPhase.
+
+    Commands go through async_send_command, which shows the target state as
+    pending until a fetch started after the command confirms it, or rolls it
+    back when the command fails or is not confirmed within FAST_POLL_WINDOW.
+
+    All requests go through an AlarmdotcomApi, which also keeps the metrics.
+
+    An AlarmdotcomEventStream can apply device events in between polls. While
+    it is connected, polling of the slices it covers slows down to the
+    interval ceiling.
+
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api: AlarmdotcomApi,
+        min_interval: timedelta,
+        max_interval: timedelta,
+        poll_phase: PollPhase,
+        tiers: dict[str, timedelta],
+    ) -> None:
+        """Initialize the coordinator."""
+        self._schedule = TieredPollSchedule(
+            tiers, min_interval, max_interval, poll_phase
+        )
+        super().__init__(
+            hass,
+            _LOGGER,
+            # Name of the data. For logging purposes.
+            name="alarmdotcom",
+            # Polling interval. Will only be polled if there are subscribers.
+            update_interval=self._schedule.next_tick(),
+        )
+        self.api = api
+        self._device_listeners: dict[tuple[str, str], list[CALLBACK_TYPE]] = {}
+        self._remove_dispatch_listener: CALLBACK_TYPE | None = None
+        self._dispatched_data: dict[str, dict[str, Any]] | None = None
+        self._dispatched_status = (True, False)
+        # Set while data comes from the warm-start snapshot, not from Alarm.com
+        self.stale = False
+        self.push_connected = False
+        # Number of full refreshes, tells them apart from other data updates
+        self.polls = 0
+        # Number of those that fetched each slice
+        self.slice_polls: Counter[str] = Counter()
+        # Sequence number of the last command; fetches remember the value they
+        # started with so results that predate a command never resolve it
+        self._command_seq = 0
+        self._slice_seqs: dict[str, int] = {}
+        self._pending: dict[tuple[str, str], PendingCommand] = {}
+        self._pending_changed: set[tuple[str, str]] = set()
+        # Slices whose last fetch failed and that show last known good data
+        self._failed_slices: set[str] = set()
+        self._device_refreshes: dict[str, Debouncer] = {}
+
+    @callback
+    def async_add_device_listener(
+        self, data_key: str, device_id: str, update_callback: CALLBACK_TYPE
+    ) -> Callable[[], None]:
+        """Listen for changes to a single device. Returns a remove function."""
+        if not self._device_listeners:
+            # Diff against the snapshot the first entities were created from
+            self._dispatched_data = self.data
+            self._dispatched_status = (self.last_update_success, self.stale)
+            self._remove_dispatch_listener = self.async_add_listener(
+                self._async_dispatch_changes
+            )
+        listener_key = (data_key, device_id)
+        self._device_listeners.setdefault(listener_key, []).append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            """Remove the device listener."""
+            listeners = self._device_listeners[listener_key]
+            listeners.remove(update_callback)
+            if not listeners:
+                del self._device_listeners[listener_key]
+            if not self._device_listeners and self._remove_dispatch_listener:
+                self._remove_dispatch_listener()
+                self._remove_dispatch_listener = None
+
+        return remove_listener
+
+    @callback
+    def _async_dispatch_changes(self) -> None:
+        """Call back the listeners of every device that changed."""
+        previous = self._dispatched_data
+        current = self.data
+        self._dispatched_data = current
+
+        status = (self.last_update_success, self.stale)
+        if previous is None or status != self._dispatched_status:
+            self._dispatched_status = status
+            changed = list(self._device_listeners)
+        else:
+            changed = [
+                listener_key
+                for listener_key in self._device_listeners
+                if listener_key in self._pending_changed
+                # Unchanged payloads hand back the very same slice
+                or (
+                    previous[listener_key[0]] is not current[listener_key[0]]
+                    and previous[listener_key[0]].get(listener_key[1])
+                    != current[listener_key[0]].get(listener_key[1])
+                )
+            ]
+        self._pending_changed.clear()
+        if not changed:
+            return
+
+        _LOGGER.debug(
+            "%s of %s Alarm.com devices changed",
+            len(changed),
+            len(self._device_listeners),
+        )
+        with self.api.metrics.time_processing("state_updates"):
+            for listener_key in changed:
+                for update_callback in list(
+                    self._device_listeners.get(listener_key, ())
+                ):
+                    update_callback()
+
+    @callback
+    def pending_state(self, data_key: str, device_id: str) -> Any | None:
+        """Return the target state of an unconfirmed command, if any."""
+        pending = self._pending.get((data_key, device_id))
+        return pending.target_state if pending else None
+
+    @callback
+    def async_get_device(self, device_id: str) -> Any | None:
+        """Return the record of a panel, sensor or garage door by id."""
+        for data_key in (DATA_ALARM, DATA_SENSORS, DATA_GARAGE_DOORS):
+            device = self.data[data_key].get(device_id)
+            if device is not None:
+                return device
+        return None
+
+    @callback
+    def async_apply_device_state(self, device_id: str, state: Any) -> None:
+        """Apply a device state pushed by the event stream."""
+        for data_key in (DATA_ALARM, DATA_SENSORS, DATA_GARAGE_DOORS):
+            device = self.data[data_key].get(device_id)
+            if device is not None:
+                break
+        else:
+            return
+        if device.state == state:
+            return
+
+        # Polls in flight predate this event, keep them from undoing it
+        self._command_seq += 1
+        self._slice_seqs[data_key] = self._command_seq
+        self.api.invalidate(data_key)
+        devices = dict(self.data[data_key])
+        devices[device_id] = replace(device, state=state)
+
+        listener_key = (data_key, device_id)
+        pending = self._pending.get(listener_key)
+        if pending is not None and pending.target_state == state:
+            del self._pending[listener_key]
+            self._pending_changed.add(listener_key)
+
+        self._async_set_partial_data({**self.data, data_key: devices})
+
+    @callback
+    def async_request_device_refresh(self, device_id: str) -> None:
+        """Refresh the data slice of a device the event stream reported on.
+
+        A burst of events refreshes each slice right away and once more after
+        EVENT_REFRESH_COOLDOWN, however many events it holds.
+        """
+        for data_key in (DATA_ALARM, DATA_SENSORS, DATA_GARAGE_DOORS):
+            if device_id in self.data[data_key]:
+                break
+        else:
+            return
+        debouncer = self._device_refreshes.get(data_key)
+        if debouncer is None:
+            debouncer = self._device_refreshes[data_key] = Debouncer(
+                self.hass,
+                _LOGGER,
+                cooldown=EVENT_REFRESH_COOLDOWN.total_seconds(),
+                immediate=True,
+                function=partial(self._async_refresh_changed_slice, data_key),
+            )
+        self.hass.async_create_task(debouncer.async_call())
+
+    async def _async_refresh_changed_slice(self, data_key: str) -> None:
+        """Refresh a data slice that changed since it was last fetched."""
+        self.api.invalidate(data_key)
+        await self._async_refresh_slice(data_key)
+
+    @callback
+    def async_stop(self) -> None:
+        """Cancel the scheduled poll and event refreshes, for unloading."""
+        if self._unsub_refresh:
+            self._unsub_refresh()
+            self._unsub_refresh = None
+        self._debounced_refresh.async_cancel()
+        for debouncer in self._device_refreshes.values():
+            debouncer.async_cancel()
+
+    @callback
+    def async_set_push_connected(self, connected: bool) -> None:
+        """Track the event stream connection, polling normally without it."""
+        if connected == self.push_connected:
+            return
+        self.push_connected = connected
+        if not connected:
+            # Catch up on what was missed while the stream was down
+            self.hass.async_create_task(self.async_request_refresh())
+
+    @callback
+    def async_set_snapshot(self, data: dict[str, Any]) -> None:
+        """Start from a stored snapshot until the first live refresh."""
+        self.data = data
+        self.stale = True
+
+    async def async_send_command(
+        self,
+        data_key: str,
+        device_id: str,
+        target_state: Any,
+        command: str,
+        *args: Any,
+    ) -> None:
+        """Send a command and show its target state as pending right away.
+
+        command and args are passed on to AlarmdotcomApi.async_command.
+
+        AlarmdotcomClientError, aiohttp's ClientError and asyncio.TimeoutError
+        are raised again after the pending state is rolled back.
+        """
+        self._command_seq += 1
+        listener_key = (data_key, device_id)
+        pending = PendingCommand(target_state, self._command_seq)
+        self._pending[listener_key] = pending
+        self._async_pending_changed(listener_key)
+
+        try:
+            await self.api.async_command(command, *args)
+        except (asyncio.TimeoutError, AlarmdotcomClientError, ClientError):
+            if self._pending.get(listener_key) is pending:
+                del self._pending[listener_key]
+                self._async_pending_changed(listener_key)
+            raise
+
+        self.api.invalidate(data_key)
+        self.update_interval = self._schedule.boost(data_key)
+        if self._unsub_refresh is not None:
+            # Bring the scheduled poll forward, unless polls are stopped
+            self._schedule_refresh()
+        self.hass.async_create_task(self._async_refresh_slice(data_key))
+
+    @callback
+    def _async_pending_changed(self, listener_key: tuple[str, str]) -> None:
+        """Call back the listeners of a device whose pending state changed."""
+        for update_callback in list(self._device_listeners.get(listener_key, ())):
+            update_callback()
+
+    async def _async_refresh_slice(self, data_key: str) -> None:
+        """Refresh only the data slice affected by a command."""
+        fetch_seq = self._command_seq
+        try:
+            fetched = {data_key: await self.api.async_fetch(data_key)}
+        except (asyncio.TimeoutError, AlarmdotcomClientError, ClientError) as err:
+            # The next regular poll will confirm the command instead
+            _LOGGER.debug("Confirm refresh of Alarm.com %s failed: %s", data_key, err)
+            return
+        if self.data is None:
+            return
+
+        with self.api.metrics.time_processing("merge"):
+            data = self._merge(fetched, fetch_seq)
+        self._async_set_partial_data(data)
+
+    @callback
+    def _async_set_partial_data(self, data: dict[str, Any]) -> None:
+        """Store data from outside a poll and notify the listeners.
+
+        Unlike async_set_updated_data, this keeps last_update_success and the
+        poll schedule as they are, so it never resumes polls that stopped
+        after the credentials were rejected.
+        """
+        self.data = data
+        for update_callback in list(self._listeners):
+            update_callback()
+
+    async def _async_update_data(self) -> dict[str, Any]:
+        """Fetch the slices that are due, then schedule the next poll."""
+        fetch_seq = self._command_seq
+        active = self._active_data_keys()
+        if self.data is None:
+            data_keys = list(DATA_KEYS)
+        else:
+            # A refresh requested out of schedule gets everything in use
+            data_keys = self._schedule.due(DATA_KEYS) or active
+        try:
+            fetched, errors = await self._async_fetch_data(data_keys)
+        except (asyncio.TimeoutError, ClientError, UpdateFailed):
+            # Do not poll again before the API lets polls through
+            self.update_interval = max(
+                self._schedule.interval(data_keys),
+                timedelta(seconds=self.api.circuit_breaker.retry_in),
+            )
+            raise
+        with self.api.metrics.time_processing("merge"):
+            data = self._merge(fetched, fetch_seq)
+        self.stale = False
+        self.polls += 1
+        pending_keys = {data_key for data_key, _ in self._pending}
+        for data_key in fetched:
+            self.slice_polls[data_key] += 1
+            self._schedule.polled(
+                data_key,
+                changed=self.data is None
+                or (
+                    data[data_key] is not self.data[data_key]
+                    and data[data_key] != self.data[data_key]
+                ),
+                in_transition=data_key in pending_keys
+                or (
+                    data_key == DATA_GARAGE_DOORS
+                    and _is_in_transition(data[DATA_GARAGE_DOORS])
+                ),
+                # The event stream does not carry thermostat readings
+                slow=data_key not in active
+                or (self.push_connected and data_key != DATA_THERMOSTATS),
+            )
+        for data_key in errors:
+            self._schedule.retry(
+                data_key,
+                max(
+                    self._schedule.interval((data_key,)),
+                    timedelta(seconds=self.api.circuit_breaker.retry_in),
+                ),
+            )
+        # The next refresh is scheduled from update_interval once this returns
+        self.update_interval = self._schedule.next_tick()
+        _LOGGER.debug("Next Alarm.com poll in %s", self.update_interval)
+        return data
+
+    @callback
+    def async_set_poll_intervals(
+        self,
+        min_interval: timedelta,
+        max_interval: timedelta,
+        tiers: dict[str, timedelta],
+    ) -> None:
+        """Apply new poll settings to the running schedule."""
+        self._schedule.reconfigure(tiers, min_interval, max_interval)
+        self.update_interval = self._schedule.next_tick()
+        if self._unsub_refresh is not None:
+            # Reschedule the next poll, unless polls are stopped
+            self._schedule_refresh()
+
+    @property
+    def poll_intervals(self) -> dict[str, float]:
+        """Return the current poll interval of each slice in seconds."""
+        return {
+            data_key: poll_interval.interval.total_seconds()
+            for data_key, poll_interval in self._schedule.intervals.items()
+        }
+
+    def _active_data_keys(self) -> list[str]:
+        """Return the slices entities listen to, all of them before any does."""
+        if not self._device_listeners:
+            return list(DATA_KEYS)
+        listened = {data_key for data_key, _ in self._device_listeners}
+        return [data_key for data_key in DATA_KEYS if data_key in listened]
+
+    def _merge(self, fetched: dict[str, Any], fetch_seq: int) -> dict[str, Any]:
+        """Merge fetched slices into the current data and resolve commands.
+
+        A slice fetched before a newer slice was stored is dropped, so a poll
+        that was in flight during a command never overwrites its confirmation.
+        """
+        data = dict(self.data or {})
+        for data_key, devices in fetched.items():
+            if self._slice_seqs.get(data_key, -1) > fetch_seq:
+                _LOGGER.debug("Dropping outdated Alarm.com %s data", data_key)
+                continue
+            data[data_key] = devices
+            self._slice_seqs[data_key] = fetch_seq
+
+        now = time.monotonic()
+        for listener_key, pending in list(self._pending.items()):
+            data_key, device_id = listener_key
+            if pending.seq > fetch_seq or data_key not in fetched:
+                continue
+            device = data[data_key].get(device_id)
+            if device is not None and device.state == pending.target_state:
+                _LOGGER.debug("Alarm.com device %s reached its target state", device_id)
+            elif now < pending.deadline:
+                continue
+            else:
+                _LOGGER.warning(
+                    "Alarm.com device %s did not reach state %s in time",
+                    device_id,
+                    pending.target_state,
+                )
+            del self._pending[listener_key]
+            self._pending_changed.add(listener_key)
+        return data
+
+    async def _async_fetch_data(
+        self, data_keys: list[str]
+    ) -> tuple[dict[str, Any], dict[str, BaseException]]:
+        """Fetch some of the panel, sensor, garage door and thermostat data.
+
+        Returns the fetched slices and the errors of the failed ones, which
+        keep their last known good data. The refresh only fails when all
+        slices failed, or when there is no data to fall back to yet.
+        """
+        try:
+            # Note: asyncio.TimeoutError and aiohttp.ClientError are already
+            # handled by the data update coordinator.
+            data, errors = await self.api.async_fetch_all(data_keys)
+            for error in errors.values():
+                if isinstance(error, AlarmdotcomClientAuthError):
+                    raise error
+            if errors and (not data or self.data is None):
+                raise next(iter(errors.values()))
+        except AlarmdotcomClientAuthError as err:
+            # Raising ConfigEntryAuthFailed will cancel future updates
+            # and start a config flow with SOURCE_REAUTH (async_step_reauth)
+            raise ConfigEntryAuthFailed from err
+        except AlarmdotcomClientError as err:
+            raise UpdateFailed(f"Error communicating with API: {err}") from err
+
+        for data_key in data_keys:
+            if data_key in errors and data_key not in self._failed_slices:
+                _LOGGER.warning(
+                    "Fetching Alarm.com %s failed, keeping the last known data: %s",
+                    data_key,
+                    errors[data_key],
+                )
+                self._failed_slices.add(data_key)
+            elif data_key in data and data_key in self._failed_slices:
+                _LOGGER.info("Fetching Alarm.com %s recovered", data_key)
+                self._failed_slices.discard(data_key)
+
+        _LOGGER.debug(
+            "Found %s from Alarm.com",
+            ", ".join(
+                f"{len(devices)} {data_key}" for data_key, devices in data.items()
+            ),
+        )
+        return data, errors
+
+
+class PendingCommand:
+    """A command whose target state was not confirmed yet."""
+
+    __slots__ = ("target_state", "seq", "deadline")
+
+    def __init__(self, target_state: Any, seq: int) -> None:
+        """Initialize the pending command."""
+        self.target_state = target_state
+        self.seq = seq
+        self.deadline = time.monotonic() + FAST_POLL_WINDOW.total_seconds()
+
+
+def _is_in_transition(garage_doors: dict[str, Any]) -> bool:
+    """Return whether a garage door is neither fully open nor fully closed."""
+    return any(
+        not (garage_door.is_open or garage_door.is_closed)
+        for garage_door in garage_doors.values()
+    )
@@ -1,20 +1,14 @@
 """ Support for Alarm.com garage doors"""
 
-from datetime import timedelta
+import asyncio
 import logging
 
-import async_timeout
+from aiohttp import ClientError
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 
-from homeassistant.exceptions import ConfigEntryAuthFailed, HomeAssistantError
-
-from homeassistant.helpers.update_coordinator import (
-    CoordinatorEntity,
-    DataUpdateCoordinator,
-    UpdateFailed,
-)
+from homeassistant.exceptions import HomeAssistantError
 
 from homeassistant.components.cover import (
     DEVICE_CLASS_GARAGE,
@@ -23,13 +17,11 @@ from homeassistant.components.cover import (
     CoverEntity,
 )
 
-from .const import DOMAIN
+from .const import DATA_GARAGE_DOORS, DOMAIN
+from .coordinator import AlarmdotcomDataUpdateCoordinator
+from .entity import AlarmdotcomEntity, async_setup_device_entities
 
-from pyalarmdotcomredux import (
-    AlarmdotcomClient,
-    AlarmdotcomClientError,
-    AlarmdotcomClientAuthError,
-)
+from pyalarmdotcomredux import AlarmdotcomClient, AlarmdotcomClientError
 
 
 _LOGGER = logging.getLogger(__name__)
@@ -39,98 +31,48 @@ async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities
 ) -> bool:
     """Setup entities"""
-    alarm_client: AlarmdotcomClient = hass.data[DOMAIN][entry.entry_id]
-
-    async def async_update_data():
-        """Fetch data from API endpoint.
-
-        This is the place to pre-process the data to lookup tables
-        so entities can quickly look up their data.
-        """
-        try:
-            # Note: asyncio.TimeoutError and aiohttp.ClientError are already
-            # handled by the data update coordinator.
-            async with async_timeout.timeout(10):
-                cover_data = await alarm_client.async_get_garage_doors_data()
-                _LOGGER.debug("Found %s covers from Alarm.com", len(cover_data))
-                return cover_data
-        except AlarmdotcomClientAuthError as err:
-            # Raising ConfigEntryAuthFailed will cancel future updates
-            # and start a config flow with SOURCE_REAUTH (async_step_reauth)
-            raise ConfigEntryAuthFailed from err
-        except AlarmdotcomClientError as err:
-            raise UpdateFailed(f"Error communicating with API: {err}") from err
-
-    coordinator = DataUpdateCoordinator(
-        hass,
-        _LOGGER,
-        # Name of the data. For logging purposes.
-        name="alarmdotcom covers",
-        update_method=async_update_data,
-        # Polling interval. Will only be polled if there are subscribers.
-        update_interval=timedelta(seconds=30),
-    )
-
-    #
-    # Fetch initial data so we have data when entities subscribe
-    #
-    # If the refresh fails, async_config_entry_first_refresh will
-    # raise ConfigEntryNotReady and setup will try again later
-    #
-    # If you do not want to retry setup on failure, use
-    # coordinator.async_refresh() instead
-    #
-    await coordinator.async_config_entry_first_refresh()
-
-    async_add_entities(
-        AlarmdotcomCoverEntity(coordinator, idx, alarm_client)
-        for idx, ent in enumerate(coordinator.data)
+    coordinator: AlarmdotcomDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+
+    async_setup_device_entities(
+        entry,
+        coordinator,
+        DATA_GARAGE_DOORS,
+        lambda device_id: [AlarmdotcomCoverEntity(coordinator, device_id)],
+        async_add_entities,
     )
 
 
-class AlarmdotcomCoverEntity(CoordinatorEntity, CoverEntity):
-    """Alarm.com Cover entity
-
-    The CoordinatorEntity class provides:
-      should_poll
-      async_update
-      async_added_to_hass
-      available
+class AlarmdotcomCoverEntity(AlarmdotcomEntity, CoverEntity):
+    """Alarm.com Cover entity"""
 
-    """
+    _data_key = DATA_GARAGE_DOORS
 
     _attr_supported_features = SUPPORT_OPEN | SUPPORT_CLOSE
     _attr_device_class = DEVICE_CLASS_GARAGE
-    _attr_is_closing = False
-    _attr_is_closing = False
-
-    def __init__(self, coordinator, idx, alarm_client: AlarmdotcomClient):
-        """Pass coordinator to CoordinatorEntity."""
-        super().__init__(coordinator)
-        self.idx = idx
-        self._alarm_client = alarm_client
 
     @property
-    def unique_id(self):
-        return self.coordinator.data[self.idx]["id"]
+    def is_closed(self):
+        """Return true if cover is closed, else False."""
+        return self._device.is_closed
 
     @property
-    def name(self):
-        return self.coordinator.data[self.idx]["description"]
+    def is_open(self):
+        """Return true if cover is open, else False."""
+        return self._device.is_open
 
     @property
-    def is_closed(self):
-        """Return true if cover is closed, else False."""
+    def is_closing(self):
+        """Return true if a close command is not confirmed yet."""
         return (
-            self.coordinator.data[self.idx]["state"]
+            self.coordinator.pending_state(DATA_GARAGE_DOORS, self._device_id)
             == AlarmdotcomClient.GARAGE_DOOR_STATE_CLOSED
         )
 
     @property
-    def is_open(self):
-        """Return true if cover is open, else False."""
+    def is_opening(self):
+        """Return true if an open command is not confirmed yet."""
         return (
-            self.coordinator.data[self.idx]["state"]
+            self.coordinator.pending_state(DATA_GARAGE_DOORS, self._device_id)
             == AlarmdotcomClient.GARAGE_DOOR_STATE_OPEN
         )
 
@@ -140,10 +82,14 @@ class AlarmdotcomCoverEntity(CoordinatorEntity, CoverEntity):
             return
 
         try:
-            await self._alarm_client.async_close_garage_door(
-                self.coordinator.data[self.idx]["id"]
+            await self.coordinator.async_send_command(
+                DATA_GARAGE_DOORS,
+                self._device_id,
+                AlarmdotcomClient.GARAGE_DOOR_STATE_CLOSED,
+                "close_garage_door",
+                self._device_id,
             )
-        except AlarmdotcomClientError as err:
+        except (asyncio.TimeoutError, AlarmdotcomClientError, ClientError) as err:
             raise HomeAssistantError(
                 "Closing of cover {cover_name} failed with error: {err}".format(
                     cover_name=self.name, err=err
@@ -156,10 +102,14 @@ class AlarmdotcomCoverEntity(CoordinatorEntity, CoverEntity):
             return
 
         try:
-            await self._alarm_client.async_open_garage_door(
-                self.coordinator.data[self.idx]["id"]
+            await self.coordinator.async_send_command(
+                DATA_GARAGE_DOORS,
+                self._device_id,
+                AlarmdotcomClient.GARAGE_DOOR_STATE_OPEN,
+                "open_garage_door",
+                self._device_id,
             )
-        except AlarmdotcomClientError as err:
+        except (asyncio.TimeoutError, AlarmdotcomClientError, ClientError) as err:
             raise HomeAssistantError(
                 "Opening of cover {cover_name} failed with error: {err}".format(
                     cover_name=self.name, err=err
@@ -0,0 +1,39 @@
+"""Diagnostics support for Alarm.com."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DATA_KEYS, DOMAIN
+from .coordinator import AlarmdotcomDataUpdateCoordinator
+
+TO_REDACT = {"username", "password", "twofactorcookie", "code"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: AlarmdotcomDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+
+    return {
+        "entry": {
+            "data": async_redact_data(entry.data, TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "coordinator": {
+            "last_update_success": coordinator.last_update_success,
+            "stale": coordinator.stale,
+            "update_interval": coordinator.update_interval.total_seconds(),
+            "poll_intervals": coordinator.poll_intervals,
+            "devices": {
+                data_key: len(coordinator.data[data_key]) for data_key in DATA_KEYS
+            },
+        },
+        "metrics": coordinator.api.metrics.as_dict(),
+        "circuit_breaker": coordinator.api.circuit_breaker.as_dict(),
+        "pending_commands": coordinator.api.commands.pending,
+    }
@@ -0,0 +1,148 @@
+"""Base entity for Alarm.com devices."""
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+import logging
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.entity import Entity
+
+from .const import ATTR_STALE, DEVICE_REMOVAL_POLLS
+from .coordinator import AlarmdotcomDataUpdateCoordinator
+
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@callback
+def async_setup_device_entities(
+    entry: ConfigEntry,
+    coordinator: AlarmdotcomDataUpdateCoordinator,
+    data_key: str,
+    entity_factory: Callable[[str], Iterable[Entity]],
+    async_add_entities,
+) -> None:
+    """Add entities for every device in a data slice and track devices over time.
+
+    Devices that show up in a later refresh get their entities added without
+    reloading the config entry. Devices that go away show as unavailable, and
+    their entities are only removed once the device was missing from
+    DEVICE_REMOVAL_POLLS polls of the slice, so a device Alarm.com briefly
+    leaves out is not removed and added back.
+    """
+    entities: dict[str, list[Entity]] = {}
+    # Polls of the slice when each missing device was first missed
+    missing_since: dict[str, int] = {}
+
+    @callback
+    def _async_update_devices() -> None:
+        """Add entities for new devices and remove those of retired ones."""
+        current_ids = coordinator.data[data_key].keys()
+        polls = coordinator.slice_polls[data_key]
+        for device_id in missing_since.keys() & current_ids:
+            del missing_since[device_id]
+        for device_id in entities.keys() - current_ids:
+            since = missing_since.setdefault(device_id, polls)
+            if polls - since >= DEVICE_REMOVAL_POLLS:
+                del missing_since[device_id]
+                _async_retire_device(device_id)
+
+        new_ids = current_ids - entities.keys()
+        if not new_ids:
+            return
+        _LOGGER.debug("Adding %s new %s from Alarm.com", len(new_ids), data_key)
+        new_entities = {
+            device_id: list(entity_factory(device_id)) for device_id in new_ids
+        }
+        entities.update(new_entities)
+        async_add_entities(
+            entity
+            for device_entities in new_entities.values()
+            for entity in device_entities
+        )
+
+    @callback
+    def _async_retire_device(device_id: str) -> None:
+        """Remove the entities of a device that is gone."""
+        _LOGGER.debug("Alarm.com device %s is gone, removing its entities", device_id)
+        registry = er.async_get(coordinator.hass)
+        for entity in entities.pop(device_id):
+            if entity.entity_id and registry.async_get(entity.entity_id) is not None:
+                # Removing the registry entry also removes the entity
+                registry.async_remove(entity.entity_id)
+            elif entity.hass is not None:
+                coordinator.hass.async_create_task(entity.async_remove())
+
+    _async_update_devices()
+    entry.async_on_unload(coordinator.async_add_listener(_async_update_devices))
+
+
+class AlarmdotcomEntity(Entity):
+    """An Alarm.com device entity looked up by device id.
+
+    Unlike CoordinatorEntity, the entity only listens to its own device, so it
+    is written only when the coordinator reports a change for that device.
+    """
+
+    _data_key: str
+
+    def __init__(
+        self, coordinator: AlarmdotcomDataUpdateCoordinator, device_id: str
+    ) -> None:
+        """Initialize the entity."""
+        self.coordinator = coordinator
+        self._device_id = device_id
+        self._attr_unique_id = device_id
+        # Static metadata is only read once, when the device is discovered
+        self._attr_name = self._device.description
+
+    @property
+    def _device(self) -> Any:
+        """Latest record of this device, see models."""
+        return self.coordinator.data[self._data_key][self._device_id]
+
+    @property
+    def _device_exists(self) -> bool:
+        """Return whether the device is part of the latest data."""
+        return self._device_id in self.coordinator.data[self._data_key]
+
+    @property
+    def should_poll(self) -> bool:
+        """No need to poll. Coordinator notifies entity of updates."""
+        return False
+
+    @property
+    def available(self) -> bool:
+        """Return if entity is available."""
+        return self.coordinator.last_update_success and self._device_exists
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Flag state restored from the warm-start snapshot."""
+        if self.coordinator.stale:
+            return {ATTR_STALE: True}
+        return None
+
+    async def async_added_to_hass(self) -> None:
+        """When entity is added to hass."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self.coordinator.async_add_device_listener(
+                self._data_key, self._device_id, self._handle_coordinator_update
+            )
+        )
+
+    async def async_update(self) -> None:
+        """Update the entity.
+
+        Only used by the generic entity update service.
+        """
+        await self.coordinator.async_request_refresh()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state, unavailable while the device is missing."""
+        self.async_write_ha_state()
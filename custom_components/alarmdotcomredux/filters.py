@@ -0,0 +1,47 @@
+"""Filtering of noisy sensor readings."""
+from __future__ import annotations
+
+import math
+import time
+
+
+class DeadbandFilter:
+    """Hold back readings too close to, or too soon after, the reported one.
+
+    A reading is significant when it differs from the last reported value by
+    more than deadband, in units or, with percent, in percent of that value.
+
+    Significant readings arriving within min_interval of the last report are
+    delayed rather than dropped, so the reported value never lags the device
+    by more than the deadband for longer than min_interval. Long-term
+    statistics, which are built from the reported values, stay within the
+    deadband as long as min_interval is shorter than their 5 minute period.
+    """
+
+    def __init__(
+        self, deadband: float = 0.0, percent: bool = False, min_interval: float = 0.0
+    ) -> None:
+        """Initialize the filter."""
+        self.deadband = deadband
+        self.percent = percent
+        self.min_interval = min_interval
+        self.reported: float | None = None
+        self._reported_at = -math.inf
+
+    def significant(self, value: float | None) -> bool:
+        """Return whether a reading differs enough from the reported one."""
+        if value is None or self.reported is None:
+            return value != self.reported
+        threshold = self.deadband
+        if self.percent:
+            threshold = abs(self.reported) * self.deadband / 100
+        return abs(value - self.reported) > threshold
+
+    def delay(self) -> float:
+        """Return the seconds until a new value may be reported."""
+        return max(0.0, self._reported_at + self.min_interval - time.monotonic())
+
+    def report(self, value: float | None) -> None:
+        """Record the value that was reported."""
+        self.reported = value
+        self._reported_at = time.monotonic()
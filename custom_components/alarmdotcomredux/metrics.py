@@ -0,0 +1,176 @@
+"""Performance metrics of the Alarm.com integration."""
+from __future__ import annotations
+
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+import time
+from typing import Any
+
+from aiohttp import TraceConfig
+
+# Upper bounds of the latency histogram buckets, in seconds
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Response bytes received within count_received_bytes in the current task
+_received_bytes: ContextVar[list[int] | None] = ContextVar(
+    "received_bytes", default=None
+)
+
+
+class EndpointMetrics:
+    """Request statistics of one Alarm.com endpoint."""
+
+    def __init__(self) -> None:
+        """Initialize the metrics."""
+        self.requests = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.hedges = 0
+        self.last_latency: float | None = None
+        self.total_latency = 0.0
+        self.latency_histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.last_payload_size: int | None = None
+
+    @property
+    def mean_latency(self) -> float | None:
+        """Mean latency of all requests, in seconds."""
+        if not self.requests:
+            return None
+        return self.total_latency / self.requests
+
+    def latency_percentile(
+        self, fraction: float, min_requests: int = 1
+    ) -> float | None:
+        """Upper bound of the histogram bucket holding a latency percentile.
+
+        None before min_requests requests, or when the percentile is beyond
+        the last bucket.
+        """
+        if self.requests < min_requests:
+            return None
+        count = 0
+        for bound, bucket in zip(LATENCY_BUCKETS, self.latency_histogram):
+            count += bucket
+            if count >= fraction * self.requests:
+                return bound
+        return None
+
+    def record(self, latency: float) -> None:
+        """Record the latency of a request."""
+        self.requests += 1
+        self.last_latency = latency
+        self.total_latency += latency
+        self.latency_histogram[bisect_left(LATENCY_BUCKETS, latency)] += 1
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the metrics for diagnostics."""
+        return {
+            "requests": self.requests,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "hedges": self.hedges,
+            "last_latency": self.last_latency,
+            "mean_latency": self.mean_latency,
+            "latency_histogram": dict(
+                zip(
+                    [f"<={bound}s" for bound in LATENCY_BUCKETS] + ["inf"],
+                    self.latency_histogram,
+                )
+            ),
+            "last_payload_size": self.last_payload_size,
+        }
+
+
+class ProcessingMetrics:
+    """Time spent by the integration itself on a processing step."""
+
+    def __init__(self) -> None:
+        """Initialize the metrics."""
+        self.runs = 0
+        self.last_duration: float | None = None
+        self.total_duration = 0.0
+
+    @property
+    def mean_duration(self) -> float | None:
+        """Mean duration of all runs, in seconds."""
+        if not self.runs:
+            return None
+        return self.total_duration / self.runs
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the metrics for diagnostics."""
+        return {
+            "runs": self.runs,
+            "last_duration": self.last_duration,
+            "mean_duration": self.mean_duration,
+        }
+
+
+def payload_trace_config() -> TraceConfig:
+    """Return a session trace config feeding count_received_bytes."""
+    trace_config = TraceConfig()
+
+    async def _async_chunk_received(session, context, params) -> None:
+        received = _received_bytes.get()
+        if received is not None:
+            received[0] += len(params.chunk)
+
+    trace_config.on_response_chunk_received.append(_async_chunk_received)
+    return trace_config
+
+
+@contextmanager
+def count_received_bytes():
+    """Count the response bytes received within the block.
+
+    Yields a list whose only item is the count. Only sessions created with
+    payload_trace_config are counted.
+    """
+    received = [0]
+    token = _received_bytes.set(received)
+    try:
+        yield received
+    finally:
+        _received_bytes.reset(token)
+
+
+class AlarmdotcomMetrics:
+    """All metrics of an account, by endpoint and by processing step."""
+
+    def __init__(self) -> None:
+        """Initialize the metrics."""
+        self.endpoints: dict[str, EndpointMetrics] = {}
+        self.processing: dict[str, ProcessingMetrics] = {}
+
+    def endpoint(self, endpoint: str) -> EndpointMetrics:
+        """Return the metrics of an endpoint."""
+        if endpoint not in self.endpoints:
+            self.endpoints[endpoint] = EndpointMetrics()
+        return self.endpoints[endpoint]
+
+    @contextmanager
+    def time_processing(self, step: str):
+        """Time a processing step."""
+        if step not in self.processing:
+            self.processing[step] = ProcessingMetrics()
+        metrics = self.processing[step]
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            metrics.runs += 1
+            metrics.last_duration = time.perf_counter() - start
+            metrics.total_duration += metrics.last_duration
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the metrics for diagnostics."""
+        return {
+            "endpoints": {
+                endpoint: metrics.as_dict()
+                for endpoint, metrics in self.endpoints.items()
+            },
+            "processing": {
+                step: metrics.as_dict() for step, metrics in self.processing.items()
+            },
+        }
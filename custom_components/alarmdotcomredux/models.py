@@ -0,0 +1,176 @@
+"""Typed Alarm.com device records.
+
+Raw API dicts are parsed into these once per fetch; every platform then reads
+the same immutable records. Equality compares all fields, which is what the
+coordinator uses to detect changed devices.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+import logging
+from typing import Any, ClassVar
+
+from .const import DATA_ALARM, DATA_GARAGE_DOORS, DATA_SENSORS, DATA_THERMOSTATS
+
+from pyalarmdotcomredux import AlarmdotcomClient
+
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Panel:
+    """An alarm panel."""
+
+    __slots__ = ("id", "description", "state")
+
+    id: str
+    description: str
+    state: int
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> Panel:
+        """Parse a raw API dict."""
+        return cls(data["id"], data["description"], data["state"])
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the raw API dict."""
+        return {"id": self.id, "description": self.description, "state": self.state}
+
+
+@dataclass(frozen=True)
+class ContactSensor:
+    """A door or window contact sensor."""
+
+    __slots__ = ("id", "description", "state")
+
+    DEVICE_TYPE: ClassVar[int] = AlarmdotcomClient.DEVICETYPE_CONTACT
+    ON_STATE: ClassVar[int] = 2
+    # Alarm.com sensor states: 1 closed, 2 open, 3 idle, 4 active
+    OFF_STATE: ClassVar[int] = 1
+
+    id: str
+    description: str
+    state: int
+
+    @property
+    def is_on(self) -> bool:
+        """Return whether the sensor is tripped."""
+        return self.state == self.ON_STATE
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> ContactSensor:
+        """Parse a raw API dict."""
+        return cls(data["id"], data["description"], data["state"])
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the raw API dict."""
+        return {
+            "id": self.id,
+            "description": self.description,
+            "deviceType": self.DEVICE_TYPE,
+            "state": self.state,
+        }
+
+
+@dataclass(frozen=True)
+class MotionSensor(ContactSensor):
+    """A motion sensor."""
+
+    __slots__ = ()
+
+    DEVICE_TYPE: ClassVar[int] = AlarmdotcomClient.DEVICETYPE_MOTION
+    ON_STATE: ClassVar[int] = 4
+    OFF_STATE: ClassVar[int] = 3
+
+
+@dataclass(frozen=True)
+class GarageDoor:
+    """A garage door."""
+
+    __slots__ = ("id", "description", "state")
+
+    id: str
+    description: str
+    state: int
+
+    @property
+    def is_open(self) -> bool:
+        """Return whether the door is fully open."""
+        return self.state == AlarmdotcomClient.GARAGE_DOOR_STATE_OPEN
+
+    @property
+    def is_closed(self) -> bool:
+        """Return whether the door is fully closed."""
+        return self.state == AlarmdotcomClient.GARAGE_DOOR_STATE_CLOSED
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> GarageDoor:
+        """Parse a raw API dict."""
+        return cls(data["id"], data["description"], data["state"])
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the raw API dict."""
+        return {"id": self.id, "description": self.description, "state": self.state}
+
+
+@dataclass(frozen=True)
+class ThermostatReading:
+    """The readings of a thermostat."""
+
+    __slots__ = ("id", "description", "ambient_temp", "humidity_level")
+
+    id: str
+    description: str
+    ambient_temp: float | None
+    humidity_level: float | None
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> ThermostatReading:
+        """Parse a raw API dict."""
+        return cls(
+            data["id"],
+            data["description"],
+            data.get("ambientTemp"),
+            data.get("humidityLevel"),
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the raw API dict."""
+        return {
+            "id": self.id,
+            "description": self.description,
+            "ambientTemp": self.ambient_temp,
+            "humidityLevel": self.humidity_level,
+        }
+
+
+SENSOR_TYPES = {
+    sensor_type.DEVICE_TYPE: sensor_type
+    for sensor_type in (ContactSensor, MotionSensor)
+}
+MODELS = {
+    DATA_ALARM: Panel,
+    DATA_GARAGE_DOORS: GarageDoor,
+    DATA_THERMOSTATS: ThermostatReading,
+}
+
+
+def parse_devices(data_key: str, devices: list[dict[str, Any]]) -> dict[str, Any]:
+    """Parse the raw dicts of a data slice into records keyed by device id."""
+    if data_key == DATA_SENSORS:
+        sensors = {}
+        for device in devices:
+            sensor_type = SENSOR_TYPES.get(device["deviceType"])
+            if sensor_type is None:
+                _LOGGER.debug(
+                    "Ignoring Alarm.com sensor %s of unsupported type %s",
+                    device["id"],
+                    device["deviceType"],
+                )
+                continue
+            sensors[device["id"]] = sensor_type.from_dict(device)
+        return sensors
+
+    model = MODELS[data_key]
+    return {device["id"]: model.from_dict(device) for device in devices}
@@ -0,0 +1,188 @@
+"""Poll scheduling for Alarm.com."""
+from __future__ import annotations
+
+from collections.abc import Iterable
+from datetime import timedelta
+import random
+import time
+
+from .const import (
+    DEFAULT_SCAN_INTERVAL,
+    FAST_POLL_WINDOW,
+    IDLE_BACKOFF_FACTOR,
+    POLL_JITTER,
+    TIER_FOLD_FACTOR,
+)
+
+# Fractional part of the golden ratio, spreads any number of phases evenly
+_GOLDEN_RATIO_FRACTION = 0.6180339887498949
+
+
+class AdaptivePollInterval:
+    """Pick the next poll interval from recent account activity.
+
+    Polls at the floor for FAST_POLL_WINDOW after a command and while a
+    device is in transition, falls back to the base interval when data
+    changed, and otherwise backs off by IDLE_BACKOFF_FACTOR up to the ceiling.
+    """
+
+    def __init__(
+        self,
+        floor: timedelta,
+        ceiling: timedelta,
+        base: timedelta = DEFAULT_SCAN_INTERVAL,
+    ) -> None:
+        """Initialize the interval."""
+        self.floor = floor
+        self.ceiling = max(floor, ceiling)
+        self.base = base
+        self.interval = self._clamp(base)
+        self._fast_until = 0.0
+
+    def boost(self) -> timedelta:
+        """Poll at the floor for a while, e.g. after a command was sent."""
+        self._fast_until = time.monotonic() + FAST_POLL_WINDOW.total_seconds()
+        self.interval = self.floor
+        return self.interval
+
+    def next_interval(self, changed: bool, in_transition: bool) -> timedelta:
+        """Return the interval until the next poll."""
+        if in_transition or time.monotonic() < self._fast_until:
+            self.interval = self.floor
+        elif changed:
+            self.interval = self._clamp(self.base)
+        else:
+            self.interval = self._clamp(
+                max(self.interval, self.floor) * IDLE_BACKOFF_FACTOR
+            )
+        return self.interval
+
+    def _clamp(self, interval: timedelta) -> timedelta:
+        """Keep an interval between floor and ceiling."""
+        return min(max(interval, self.floor), self.ceiling)
+
+
+class TieredPollSchedule:
+    """Poll every data slice on its own AdaptivePollInterval.
+
+    Each slice starts from the interval of its tier, e.g. minutes for
+    thermostats and seconds for sensors. A tick polls the slices that are
+    due, and takes along those due within TIER_FOLD_FACTOR of their interval
+    so they do not need a tick of their own shortly after.
+    """
+
+    def __init__(
+        self,
+        tiers: dict[str, timedelta],
+        floor: timedelta,
+        ceiling: timedelta,
+        phase: PollPhase,
+    ) -> None:
+        """Initialize the schedule from the base interval of each slice."""
+        self._phase = phase
+        self._due: dict[str, float] = {}
+        self.reconfigure(tiers, floor, ceiling)
+
+    def reconfigure(
+        self, tiers: dict[str, timedelta], floor: timedelta, ceiling: timedelta
+    ) -> None:
+        """Change the tiers and bounds, keeping when each slice is due.
+
+        No slice is left waiting for longer than its new interval.
+        """
+        self.floor = floor
+        self.intervals = {
+            data_key: AdaptivePollInterval(floor, max(ceiling, tier), tier)
+            for data_key, tier in tiers.items()
+        }
+        now = time.monotonic()
+        for data_key, due in self._due.items():
+            self._due[data_key] = min(
+                due, now + self.intervals[data_key].interval.total_seconds()
+            )
+
+    def due(self, data_keys: Iterable[str]) -> list[str]:
+        """Return the slices to poll at this tick."""
+        now = time.monotonic()
+        return [
+            data_key
+            for data_key in data_keys
+            if self._due.get(data_key, now) - now
+            <= self.intervals[data_key].interval.total_seconds() * TIER_FOLD_FACTOR
+        ]
+
+    def polled(
+        self, data_key: str, changed: bool, in_transition: bool, slow: bool
+    ) -> None:
+        """Schedule the next poll of a slice that was just polled.
+
+        Slow slices go to the ceiling unless something is in transition.
+        """
+        poll_interval = self.intervals[data_key]
+        interval = poll_interval.next_interval(changed, in_transition)
+        if slow and interval > self.floor:
+            interval = poll_interval.ceiling
+        if interval > self.floor:
+            interval = self._phase.spread(interval)
+        self._due[data_key] = time.monotonic() + interval.total_seconds()
+
+    def boost(self, data_key: str) -> timedelta:
+        """Poll a slice at the floor for a while, e.g. after a command."""
+        interval = self.intervals[data_key].boost()
+        self._due[data_key] = time.monotonic() + interval.total_seconds()
+        return interval
+
+    def retry(self, data_key: str, delay: timedelta) -> None:
+        """Poll a slice whose fetch failed again after a delay."""
+        self._due[data_key] = time.monotonic() + delay.total_seconds()
+
+    def interval(self, data_keys: Iterable[str]) -> timedelta:
+        """Return the shortest current interval of some slices."""
+        return min(self.intervals[data_key].interval for data_key in data_keys)
+
+    def next_tick(self) -> timedelta:
+        """Return the delay until the next slice is due."""
+        now = time.monotonic()
+        delay = min(self._due.get(data_key, now) - now for data_key in self.intervals)
+        return max(timedelta(seconds=delay), self.floor)
+
+
+class PollPhases:
+    """Hand out distinct poll phases to the accounts of this integration."""
+
+    def __init__(self) -> None:
+        """Initialize the phases."""
+        self._slots: dict[str, int] = {}
+
+    def register(self, entry_id: str) -> PollPhase:
+        """Assign the lowest free slot to a config entry."""
+        slot = self._slots.get(entry_id)
+        if slot is None:
+            used = set(self._slots.values())
+            slot = next(slot for slot in range(len(used) + 1) if slot not in used)
+            self._slots[entry_id] = slot
+        return PollPhase((slot * _GOLDEN_RATIO_FRACTION) % 1)
+
+    def release(self, entry_id: str) -> None:
+        """Free the slot of an unloaded config entry."""
+        self._slots.pop(entry_id, None)
+
+
+class PollPhase:
+    """Keep the polls of one account at its own offset within the interval.
+
+    Without this, accounts set up together poll in the same second forever.
+    """
+
+    def __init__(self, phase: float) -> None:
+        """Initialize the phase, as a fraction of the poll interval."""
+        self.phase = phase
+
+    def spread(self, interval: timedelta) -> timedelta:
+        """Return a delay close to interval that lands on this account's phase."""
+        period = interval.total_seconds()
+        offset = (self.phase * period - (time.time() + period)) % period
+        if offset > period / 2:
+            offset -= period
+        jitter = random.uniform(-POLL_JITTER, POLL_JITTER) * period
+        return timedelta(seconds=period + offset + jitter)
@@ -0,0 +1,122 @@
+"""What a loaded Alarm.com config entry runs besides its coordinator."""
+from __future__ import annotations
+
+from collections.abc import Callable, Mapping
+import logging
+from typing import Any
+
+from aiohttp import ClientSession
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from .activity import AlarmdotcomActivityFeed
+from .const import CONF_STREAM_URL
+from .coordinator import AlarmdotcomDataUpdateCoordinator
+from .stream import AlarmdotcomEventStream
+
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class AlarmdotcomEntryRuntime:
+    """The session, event stream and activity feed of a config entry.
+
+    Kept in hass.data[DATA_RUNTIMES] by entry id for as long as the entry is
+    set up, so the options listener can reach them. Platforms add their own
+    listeners for changed options with async_add_options_listener.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        session: ClientSession,
+        dedicated: bool,
+        pool_size: int,
+    ) -> None:
+        """Initialize the runtime."""
+        self._hass = hass
+        self._entry = entry
+        self.session = session
+        # Settings the session was created with, changing them needs a reload
+        self.dedicated = dedicated
+        self.pool_size = pool_size
+        self.coordinator: AlarmdotcomDataUpdateCoordinator | None = None
+        self._stream: AlarmdotcomEventStream | None = None
+        self._stop_activity_feed: CALLBACK_TYPE | None = None
+        self._options_listeners: list[Callable[[Mapping[str, Any]], None]] = []
+
+    @callback
+    def async_add_options_listener(
+        self, options_listener: Callable[[Mapping[str, Any]], None]
+    ) -> CALLBACK_TYPE:
+        """Call back with the new options when they change.
+
+        Returns a function to remove the listener.
+        """
+        self._options_listeners.append(options_listener)
+
+        @callback
+        def remove_listener() -> None:
+            """Stop calling back."""
+            self._options_listeners.remove(options_listener)
+
+        return remove_listener
+
+    @callback
+    def async_options_updated(self, options: Mapping[str, Any]) -> None:
+        """Pass changed options on to the listeners."""
+        for options_listener in list(self._options_listeners):
+            options_listener(options)
+
+    @callback
+    def async_set_push(self, enabled: bool) -> None:
+        """Start or stop the event stream."""
+        if enabled and self._stream is None:
+            self._stream = AlarmdotcomEventStream(
+                self._hass,
+                self.session,
+                self.coordinator,
+                self._entry.options.get(CONF_STREAM_URL),
+            )
+            self._stream.async_start()
+        elif not enabled and self._stream is not None:
+            self._stream.async_stop()
+            self._stream = None
+
+    async def async_set_activity_feed(self, enabled: bool) -> None:
+        """Start or stop replaying the activity history."""
+        if enabled and self._stop_activity_feed is None:
+            activity_feed = AlarmdotcomActivityFeed(
+                self._hass, self.coordinator, self._entry.entry_id
+            )
+            await activity_feed.async_load()
+            if self._stop_activity_feed is None:
+                self._stop_activity_feed = activity_feed.async_start()
+        elif not enabled and self._stop_activity_feed is not None:
+            self._stop_activity_feed()
+            self._stop_activity_feed = None
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop the event stream, the activity feed and the coordinator."""
+        self.async_set_push(False)
+        if self._stop_activity_feed is not None:
+            self._stop_activity_feed()
+            self._stop_activity_feed = None
+        if self.coordinator is not None:
+            self.coordinator.async_stop()
+
+    async def async_close_session(self) -> None:
+        """Close the session.
+
+        Only a dedicated session owns its connector. Any other shares the
+        connector of HA's own session, and is detached from it instead.
+        """
+        if self.session.closed:
+            return
+        if self.dedicated:
+            await self.session.close()
+        else:
+            self.session.detach()
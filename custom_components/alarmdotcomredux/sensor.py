@@ -1,19 +1,11 @@
 """ Sensor platform for Alarm.com """
 
-from datetime import timedelta
+from collections.abc import Mapping
 import logging
-
-import async_timeout
+from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
-
-from homeassistant.exceptions import ConfigEntryAuthFailed
-from homeassistant.helpers.update_coordinator import (
-    CoordinatorEntity,
-    DataUpdateCoordinator,
-    UpdateFailed,
-)
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 
 from homeassistant.components.sensor import (
     DEVICE_CLASS_TEMPERATURE,
@@ -23,105 +15,203 @@ from homeassistant.components.sensor import (
 )
 
 from homeassistant.const import (
+    ENTITY_CATEGORY_DIAGNOSTIC,
     PERCENTAGE,
     TEMP_FAHRENHEIT,
+    TIME_MILLISECONDS,
 )
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN
-
-from pyalarmdotcomredux import (
-    AlarmdotcomClient,
-    AlarmdotcomClientError,
-    AlarmdotcomClientAuthError,
+from .api import ACCOUNT_ENDPOINT, ACTIVITY_ENDPOINT
+from .const import (
+    CONF_DEADBAND,
+    CONF_DEADBAND_PERCENT,
+    CONF_MIN_INTERVAL,
+    CONF_SENSOR_FILTERS,
+    DATA_KEYS,
+    DATA_RUNTIMES,
+    DATA_THERMOSTATS,
+    DEFAULT_SENSOR_FILTERS,
+    DOMAIN,
 )
+from .coordinator import AlarmdotcomDataUpdateCoordinator
+from .entity import AlarmdotcomEntity, async_setup_device_entities
+from .filters import DeadbandFilter
+from .runtime import AlarmdotcomEntryRuntime
 
 
 _LOGGER = logging.getLogger(__name__)
 
 SENSORS_DEFS = {
     "ambientTemp": {
+        "attribute": "ambient_temp",
         "label": "Ambient Temperature",
         "type": DEVICE_CLASS_TEMPERATURE,
         "unit": TEMP_FAHRENHEIT,
     },
     "humidityLevel": {
+        "attribute": "humidity_level",
         "label": "Humidity Level",
         "type": DEVICE_CLASS_HUMIDITY,
         "unit": PERCENTAGE,
     },
 }
 
+# Processing steps timed by the coordinator, see AlarmdotcomMetrics
+PROCESSING_STEPS = {
+    "merge": "Merge Time",
+    "state_updates": "State Update Time",
+}
+
 
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities
 ) -> bool:
     """Setup entities"""
-    alarm_client: AlarmdotcomClient = hass.data[DOMAIN][entry.entry_id]
-
-    async def async_update_data():
-        """Fetch data from API endpoint.
-
-        This is the place to pre-process the data to lookup tables
-        so entities can quickly look up their data.
-        """
-        try:
-            # Note: asyncio.TimeoutError and aiohttp.ClientError are already
-            # handled by the data update coordinator.
-            async with async_timeout.timeout(10):
-                thermostats_data = await alarm_client.async_get_thermostats_data()
-                sensor_data = []
-                for thermostat in thermostats_data:
-                    for sensor in ["ambientTemp", "humidityLevel"]:
-                        sensor_data.append(
-                            {
-                                "id": "{}-{}".format(thermostat["id"], sensor),
-                                "description": "{} {}".format(
-                                    thermostat["description"],
-                                    SENSORS_DEFS[sensor]["label"],
-                                ),
-                                "device_class": SENSORS_DEFS[sensor]["type"],
-                                "unit": SENSORS_DEFS[sensor]["unit"],
-                                "value": thermostat[sensor],
-                            }
-                        )
-                _LOGGER.debug("Found %s sensors from Alarm.com", len(sensor_data))
-                return sensor_data
-        except AlarmdotcomClientAuthError as err:
-            # Raising ConfigEntryAuthFailed will cancel future updates
-            # and start a config flow with SOURCE_REAUTH (async_step_reauth)
-            raise ConfigEntryAuthFailed from err
-        except AlarmdotcomClientError as err:
-            raise UpdateFailed(f"Error communicating with API: {err}") from err
-
-    coordinator = DataUpdateCoordinator(
-        hass,
-        _LOGGER,
-        # Name of the data. For logging purposes.
-        name="alarmdotcom sensors",
-        update_method=async_update_data,
-        # Polling interval. Will only be polled if there are subscribers.
-        update_interval=timedelta(seconds=30),
-    )
+    coordinator: AlarmdotcomDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    runtime: AlarmdotcomEntryRuntime = hass.data[DATA_RUNTIMES][entry.entry_id]
 
-    #
-    # Fetch initial data so we have data when entities subscribe
-    #
-    # If the refresh fails, async_config_entry_first_refresh will
-    # raise ConfigEntryNotReady and setup will try again later
-    #
-    # If you do not want to retry setup on failure, use
-    # coordinator.async_refresh() instead
-    #
-    await coordinator.async_config_entry_first_refresh()
+    def _sensor_filter(sensor: str) -> DeadbandFilter:
+        """Create the reading filter of a thermostat sensor."""
+        sensor_filter = DeadbandFilter()
+        _configure_filter(sensor_filter, entry.options, sensor)
+        return sensor_filter
+
+    async_setup_device_entities(
+        entry,
+        coordinator,
+        DATA_THERMOSTATS,
+        lambda device_id: [
+            ThermostatSensorEntity(
+                coordinator, runtime, device_id, sensor, _sensor_filter(sensor)
+            )
+            for sensor in SENSORS_DEFS
+        ],
+        async_add_entities,
+    )
 
     async_add_entities(
-        ThermostatSensorEntity(coordinator, idx)
-        for idx, ent in enumerate(coordinator.data)
+        [
+            *(
+                EndpointLatencySensorEntity(coordinator, entry, endpoint)
+                for endpoint in (ACCOUNT_ENDPOINT, ACTIVITY_ENDPOINT, *DATA_KEYS)
+            ),
+            *(
+                ProcessingTimeSensorEntity(coordinator, entry, step)
+                for step in PROCESSING_STEPS
+            ),
+        ]
     )
 
 
-class ThermostatSensorEntity(CoordinatorEntity, SensorEntity):
-    """An entity using CoordinatorEntity.
+def _configure_filter(
+    sensor_filter: DeadbandFilter, options: Mapping[str, Any], sensor: str
+) -> None:
+    """Apply the options of a reading to its filter.
+
+    Options override the defaults per reading, e.g.
+    {"humidityLevel": {"deadband": 5, "deadband_percent": True}}.
+    """
+    settings = {
+        **DEFAULT_SENSOR_FILTERS[sensor],
+        **options.get(CONF_SENSOR_FILTERS, {}).get(sensor, {}),
+    }
+    sensor_filter.deadband = settings[CONF_DEADBAND]
+    sensor_filter.percent = settings[CONF_DEADBAND_PERCENT]
+    sensor_filter.min_interval = settings[CONF_MIN_INTERVAL]
+
+
+class ThermostatSensorEntity(AlarmdotcomEntity, SensorEntity):
+    """Alarm.com thermostat reading entity.
+
+    Readings go through a DeadbandFilter, so jitter does not turn into state
+    writes and recorder rows. The filter follows the options of the entry
+    for as long as the entity is added.
+    """
+
+    _data_key = DATA_THERMOSTATS
+    _attr_state_class = STATE_CLASS_MEASUREMENT
+
+    def __init__(
+        self,
+        coordinator,
+        runtime: AlarmdotcomEntryRuntime,
+        device_id,
+        sensor,
+        sensor_filter: DeadbandFilter,
+    ):
+        """Initialize the entity."""
+        super().__init__(coordinator, device_id)
+        self._runtime = runtime
+        self._attr_unique_id = "{}-{}".format(device_id, sensor)
+        self._attr_name = "{} {}".format(
+            self._device.description, SENSORS_DEFS[sensor]["label"]
+        )
+        self._attr_native_unit_of_measurement = SENSORS_DEFS[sensor]["unit"]
+        self._attr_device_class = SENSORS_DEFS[sensor]["type"]
+        self.sensor = sensor
+        self._attribute = SENSORS_DEFS[sensor]["attribute"]
+        self._filter = sensor_filter
+        self._filter.report(getattr(self._device, self._attribute))
+        self._written_status: tuple[bool, bool] | None = None
+        self._cancel_deferred_write: CALLBACK_TYPE | None = None
+
+    @property
+    def native_value(self):
+        """Return the last reading that passed the filter."""
+        return self._filter.reported
+
+    async def async_added_to_hass(self) -> None:
+        """When entity is added to hass."""
+        await super().async_added_to_hass()
+        self._written_status = (self.available, self.coordinator.stale)
+        self.async_on_remove(self._async_cancel_deferred_write)
+        self.async_on_remove(
+            self._runtime.async_add_options_listener(self._async_options_updated)
+        )
+
+    @callback
+    def _async_options_updated(self, options: Mapping[str, Any]) -> None:
+        """Apply changed filter options to the filter."""
+        _configure_filter(self._filter, options, self.sensor)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state for significant readings and status changes only."""
+        if self._device_exists:
+            status = (self.available, self.coordinator.stale)
+            value = getattr(self._device, self._attribute)
+            if status == self._written_status:
+                if not self._filter.significant(value):
+                    return
+                delay = self._filter.delay()
+                if delay:
+                    if self._cancel_deferred_write is None:
+                        self._cancel_deferred_write = async_call_later(
+                            self.hass, delay, self._async_deferred_write
+                        )
+                    return
+            self._filter.report(value)
+            self._written_status = status
+        super()._handle_coordinator_update()
+
+    @callback
+    def _async_deferred_write(self, _now) -> None:
+        """Write a reading held back by the minimum interval."""
+        self._cancel_deferred_write = None
+        self._handle_coordinator_update()
+
+    @callback
+    def _async_cancel_deferred_write(self) -> None:
+        """Cancel a pending deferred write."""
+        if self._cancel_deferred_write is not None:
+            self._cancel_deferred_write()
+            self._cancel_deferred_write = None
+
+
+class DiagnosticSensorEntity(CoordinatorEntity, SensorEntity):
+    """Base of the performance diagnostic sensors, disabled by default.
 
     The CoordinatorEntity class provides:
       should_poll
@@ -131,33 +221,66 @@ class ThermostatSensorEntity(CoordinatorEntity, SensorEntity):
 
     """
 
+    _attr_entity_category = ENTITY_CATEGORY_DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_native_unit_of_measurement = TIME_MILLISECONDS
     _attr_state_class = STATE_CLASS_MEASUREMENT
 
-    def __init__(self, coordinator, idx):
+    def __init__(self, coordinator, entry: ConfigEntry, key: str, label: str):
         """Pass coordinator to CoordinatorEntity."""
         super().__init__(coordinator)
-        self.idx = idx
+        self._attr_unique_id = "{}-{}".format(entry.entry_id, key)
+        self._attr_name = "{} {}".format(entry.title, label)
 
-    @property
-    def name(self):
-        """Name of the entity."""
-        return self.coordinator.data[self.idx]["description"]
 
-    @property
-    def unique_id(self):
-        """Unique ID of the entity."""
-        return self.coordinator.data[self.idx]["id"]
+class EndpointLatencySensorEntity(DiagnosticSensorEntity):
+    """Latency of the last request to an Alarm.com endpoint."""
+
+    def __init__(self, coordinator, entry: ConfigEntry, endpoint: str):
+        """Initialize the entity."""
+        super().__init__(
+            coordinator,
+            entry,
+            "{}-latency".format(endpoint),
+            "{} Latency".format(endpoint.replace("_", " ").title()),
+        )
+        self.endpoint = endpoint
 
     @property
     def native_value(self):
         """Return entity native value."""
-        return self.coordinator.data[self.idx]["value"]
+        latency = self.coordinator.api.metrics.endpoint(self.endpoint).last_latency
+        return None if latency is None else round(latency * 1000, 1)
 
     @property
-    def native_unit_of_measurement(self):
-        """Return entity native unit of measurement."""
-        return self.coordinator.data[self.idx]["unit"]
+    def extra_state_attributes(self):
+        """Return the request statistics of the endpoint."""
+        metrics = self.coordinator.api.metrics.endpoint(self.endpoint)
+        return {
+            "requests": metrics.requests,
+            "failures": metrics.failures,
+            "timeouts": metrics.timeouts,
+            "mean_latency": (
+                None
+                if metrics.mean_latency is None
+                else round(metrics.mean_latency * 1000, 1)
+            ),
+            "payload_size": metrics.last_payload_size,
+        }
+
+
+class ProcessingTimeSensorEntity(DiagnosticSensorEntity):
+    """Time the integration itself spent on a processing step."""
+
+    def __init__(self, coordinator, entry: ConfigEntry, step: str):
+        """Initialize the entity."""
+        super().__init__(coordinator, entry, step, PROCESSING_STEPS[step])
+        self.step = step
 
     @property
-    def device_class(self):
-        return self.coordinator.data[self.idx]["device_class"]
+    def native_value(self):
+        """Return entity native value."""
+        metrics = self.coordinator.api.metrics.processing.get(self.step)
+        if metrics is None or metrics.last_duration is None:
+            return None
+        return round(metrics.last_duration * 1000, 2)
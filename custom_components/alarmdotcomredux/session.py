@@ -0,0 +1,103 @@
+"""Persistence of Alarm.com sessions."""
+from __future__ import annotations
+
+import hashlib
+import logging
+
+from aiohttp import ClientSession, ClientTimeout, CookieJar, TCPConnector
+from yarl import URL
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import SERVER_SOFTWARE
+from homeassistant.helpers.storage import Store
+from homeassistant.util import ssl as ssl_util
+
+from .const import (
+    ALARMDOTCOM_URL,
+    DNS_CACHE_TTL,
+    DOMAIN,
+    KEEPALIVE_TIMEOUT,
+)
+from .metrics import payload_trace_config
+
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 10
+
+
+class SessionStore:
+    """Keep the session cookies of an account in HA storage.
+
+    Restoring them at startup lets AlarmdotcomClient reuse the session; it
+    only logs in again when Alarm.com rejects it.
+    """
+
+    def __init__(self, hass: HomeAssistant, username: str) -> None:
+        """Initialize the store."""
+        # Storage keys end up as file names, keep the username out of them
+        account_key = hashlib.sha256(username.encode()).hexdigest()[:16]
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.session.{account_key}")
+        self._url = URL(ALARMDOTCOM_URL)
+        self._cookies: dict[str, str] = {}
+
+    async def async_restore(self, session: ClientSession) -> bool:
+        """Load the stored cookies into a session. Returns whether any were found."""
+        stored = await self._store.async_load()
+        if not stored or not stored.get("cookies"):
+            return False
+        self._cookies = stored["cookies"]
+        session.cookie_jar.update_cookies(self._cookies, self._url)
+        _LOGGER.debug("Restored %s Alarm.com session cookies", len(self._cookies))
+        return True
+
+    async def async_save(self, session: ClientSession) -> None:
+        """Store the current cookies of a session."""
+        self._cookies = self._current_cookies(session)
+        await self._store.async_save({"cookies": self._cookies})
+
+    @callback
+    def async_schedule_save(self, session: ClientSession) -> None:
+        """Store the cookies of a session in a while if they changed."""
+        cookies = self._current_cookies(session)
+        if cookies == self._cookies:
+            return
+        self._cookies = cookies
+        self._store.async_delay_save(lambda: {"cookies": cookies}, SAVE_DELAY)
+
+    async def async_remove(self) -> None:
+        """Forget the stored session."""
+        await self._store.async_remove()
+
+    def _current_cookies(self, session: ClientSession) -> dict[str, str]:
+        """Return the Alarm.com cookies of a session."""
+        return {
+            name: morsel.value
+            for name, morsel in session.cookie_jar.filter_cookies(self._url).items()
+        }
+
+
+@callback
+def async_create_dedicated_session(pool_size: int) -> ClientSession:
+    """Create a session of one account, apart from the HA-wide one.
+
+    It has its own cookie jar and a pool of pool_size kept-alive connections
+    to Alarm.com with cached DNS, so other integrations cannot starve it.
+    The caller has to close it.
+    """
+    return ClientSession(
+        connector=TCPConnector(
+            limit=pool_size,
+            limit_per_host=pool_size,
+            ttl_dns_cache=DNS_CACHE_TTL.total_seconds(),
+            keepalive_timeout=KEEPALIVE_TIMEOUT.total_seconds(),
+            enable_cleanup_closed=True,
+            ssl=ssl_util.client_context(),
+        ),
+        cookie_jar=CookieJar(),
+        headers={"User-Agent": SERVER_SOFTWARE},
+        trace_configs=[payload_trace_config()],
+        # Requests are bounded by AlarmdotcomApi
+        timeout=ClientTimeout(total=None),
+    )
@@ -0,0 +1,64 @@
+"""Warm-start snapshot of Alarm.com data."""
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DATA_KEYS, DOMAIN
+from .models import parse_devices
+
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 60
+
+
+class SnapshotStore:
+    """Keep the last good coordinator data of a config entry in HA storage.
+
+    Entities are created from it at startup, so the first live refresh can
+    run in the background instead of blocking setup.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the store."""
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.snapshot.{entry_id}")
+        self._saved: dict[str, Any] | None = None
+
+    async def async_load(self) -> dict[str, Any] | None:
+        """Return the stored snapshot as device records, if any."""
+        stored = await self._store.async_load()
+        if not stored or any(data_key not in stored for data_key in DATA_KEYS):
+            return None
+        # Stored in the raw API format, so it survives changes to the models
+        self._saved = {
+            data_key: parse_devices(data_key, list(stored[data_key].values()))
+            for data_key in DATA_KEYS
+        }
+        return self._saved
+
+    @callback
+    def async_schedule_save(self, data: dict[str, Any] | None) -> None:
+        """Store a snapshot in a while if it changed."""
+        if data is None or data == self._saved:
+            return
+        self._saved = data
+        self._store.async_delay_save(lambda: _as_raw(data), SAVE_DELAY)
+
+    async def async_remove(self) -> None:
+        """Forget the stored snapshot."""
+        await self._store.async_remove()
+
+
+def _as_raw(data: dict[str, Any]) -> dict[str, Any]:
+    """Return coordinator data in the raw API format."""
+    return {
+        data_key: {
+            device_id: device.as_dict() for device_id, device in devices.items()
+        }
+        for data_key, devices in data.items()
+    }
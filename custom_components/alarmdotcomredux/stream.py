@@ -0,0 +1,153 @@
+"""Real-time event stream from Alarm.com."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any
+
+from aiohttp import ClientError, ClientSession, WSMsgType
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import STREAM_RECONNECT_MAX, STREAM_RECONNECT_MIN, STREAM_TOKEN_URL
+from .coordinator import AlarmdotcomDataUpdateCoordinator
+from .models import ContactSensor, GarageDoor, Panel
+
+from pyalarmdotcomredux import AlarmdotcomClient
+
+
+_LOGGER = logging.getLogger(__name__)
+
+# Event types of the web app's live feed that carry a new device state.
+# Any other event on a known device triggers a refresh of its data instead.
+EVENT_CLOSED = 0
+EVENT_DISARMED = 8
+EVENT_ARMED_STAY = 9
+EVENT_ARMED_AWAY = 10
+EVENT_OPENED = 15
+EVENT_OPENED_CLOSED = 100
+
+PANEL_EVENT_STATES = {
+    EVENT_DISARMED: AlarmdotcomClient.ALARM_STATE_DISARMED,
+    EVENT_ARMED_STAY: AlarmdotcomClient.ALARM_STATE_ARMED_STAY,
+    EVENT_ARMED_AWAY: AlarmdotcomClient.ALARM_STATE_ARMED_AWAY,
+}
+GARAGE_DOOR_EVENT_STATES = {
+    EVENT_OPENED: AlarmdotcomClient.GARAGE_DOOR_STATE_OPEN,
+    EVENT_CLOSED: AlarmdotcomClient.GARAGE_DOOR_STATE_CLOSED,
+}
+
+
+class AlarmdotcomEventStream:
+    """Apply device events from Alarm.com's live feed to the coordinator.
+
+    While connected, the coordinator only polls at its ceiling as a safety
+    net. When the connection drops, regular polling takes over until the
+    stream reconnects.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        session: ClientSession,
+        coordinator: AlarmdotcomDataUpdateCoordinator,
+        stream_url: str | None = None,
+    ) -> None:
+        """Initialize the stream.
+
+        stream_url connects to a fixed websocket URL instead of asking
+        Alarm.com for one, e.g. for a local stand-in server.
+        """
+        self._hass = hass
+        self._session = session
+        self._coordinator = coordinator
+        self._stream_url = stream_url
+        self._task: asyncio.Task | None = None
+
+    @callback
+    def async_start(self) -> None:
+        """Start streaming in the background."""
+        self._task = self._hass.async_create_task(self._async_run())
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop streaming."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._coordinator.async_set_push_connected(False)
+
+    async def _async_run(self) -> None:
+        """Stay connected, backing off between failed attempts."""
+        delay = STREAM_RECONNECT_MIN.total_seconds()
+        while True:
+            try:
+                await self._async_listen()
+                delay = STREAM_RECONNECT_MIN.total_seconds()
+            except (asyncio.TimeoutError, ClientError, KeyError, ValueError) as err:
+                _LOGGER.debug("Alarm.com event stream failed: %s", err)
+            self._coordinator.async_set_push_connected(False)
+            _LOGGER.debug("Reconnecting to Alarm.com event stream in %ss", delay)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, STREAM_RECONNECT_MAX.total_seconds())
+
+    async def _async_listen(self) -> None:
+        """Connect and apply events until the connection closes."""
+        url = self._stream_url or await self._async_get_stream_url()
+        async with self._session.ws_connect(url, heartbeat=30) as websocket:
+            _LOGGER.debug("Connected to Alarm.com event stream")
+            self._coordinator.async_set_push_connected(True)
+            async for message in websocket:
+                if message.type == WSMsgType.TEXT:
+                    async_apply_event(self._coordinator, message.json())
+                elif message.type in (WSMsgType.CLOSED, WSMsgType.ERROR):
+                    break
+
+    async def _async_get_stream_url(self) -> str:
+        """Ask Alarm.com for an authenticated websocket URL."""
+        async with self._session.get(
+            STREAM_TOKEN_URL, headers=self._coordinator.api.api_headers()
+        ) as response:
+            response.raise_for_status()
+            token = await response.json()
+        return "{}/?f=1&auth={}".format(token["metaData"]["endpoint"], token["value"])
+
+
+@callback
+def async_apply_event(
+    coordinator: AlarmdotcomDataUpdateCoordinator,
+    event: dict[str, Any],
+    refresh_unknown: bool = True,
+) -> None:
+    """Apply one live feed event to the coordinator data.
+
+    Also replays events of the activity history, converted to the live feed
+    format, see AlarmdotcomActivityFeed. Events without a known state
+    refresh their device unless refresh_unknown is False.
+    """
+    if "UnitId" not in event or "DeviceId" not in event:
+        return
+    device_id = "{}-{}".format(event["UnitId"], event["DeviceId"])
+    device = coordinator.async_get_device(device_id)
+    if device is None:
+        return
+
+    event_type = event.get("EventType")
+    if isinstance(device, ContactSensor):
+        if event_type == EVENT_OPENED_CLOSED:
+            # A pulse that is already over, keep it visible in history
+            coordinator.async_apply_device_state(device_id, device.ON_STATE)
+            coordinator.async_apply_device_state(device_id, device.OFF_STATE)
+            return
+        states = {EVENT_OPENED: device.ON_STATE, EVENT_CLOSED: device.OFF_STATE}
+    elif isinstance(device, GarageDoor):
+        states = GARAGE_DOOR_EVENT_STATES
+    elif isinstance(device, Panel):
+        states = PANEL_EVENT_STATES
+    else:
+        states = {}
+
+    if event_type in states:
+        coordinator.async_apply_device_state(device_id, states[event_type])
+    elif refresh_unknown:
+        coordinator.async_request_device_refresh(device_id)
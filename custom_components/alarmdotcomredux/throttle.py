@@ -0,0 +1,184 @@
+"""Request throttling for Alarm.com."""
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from email.utils import parsedate_to_datetime
+import random
+import time
+from typing import Any
+
+from aiohttp import ClientResponseError
+
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    BACKOFF_BASE,
+    BACKOFF_JITTER,
+    BACKOFF_MAX,
+    CIRCUIT_BREAKER_THRESHOLD,
+)
+
+HTTP_TOO_MANY_REQUESTS = 429
+
+
+class TokenBucket:
+    """Limit the sustained request rate of an account, allowing bursts."""
+
+    def __init__(self, rate: float, capacity: int) -> None:
+        """Initialize a full bucket."""
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+
+    async def async_acquire(self) -> None:
+        """Take a token, waiting for one if the bucket is empty."""
+        while True:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def has_token(self) -> bool:
+        """Return whether a token can be taken without waiting."""
+        self._refill()
+        return self._tokens >= 1
+
+    def take(self) -> None:
+        """Take a token without waiting, possibly going into debt.
+
+        Used by user commands: they never wait, but still delay the polls
+        behind them.
+        """
+        self._refill()
+        self._tokens -= 1
+
+    def _refill(self) -> None:
+        """Add the tokens accumulated since the last refill."""
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+
+class ConcurrencyLimit:
+    """Bound the requests of an account in flight at once.
+
+    Unlike asyncio.Semaphore, the limit can change while requests are
+    waiting or in flight.
+    """
+
+    def __init__(self, limit: int) -> None:
+        """Initialize the limit."""
+        self.limit = limit
+        self.active = 0
+        self._waiters: deque[asyncio.Future] = deque()
+
+    async def __aenter__(self) -> None:
+        """Wait for a free slot and take it."""
+        while self.active >= self.limit:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                # Pass the wake-up on if it already came
+                self._wake()
+                raise
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+        self.active += 1
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        """Free the slot."""
+        self.active -= 1
+        self._wake()
+
+    def set_limit(self, limit: int) -> None:
+        """Change the limit, letting waiting requests through if it grew."""
+        self.limit = limit
+        self._wake()
+
+    def _wake(self) -> None:
+        """Wake as many waiting requests as there are free slots."""
+        free = self.limit - self.active
+        for waiter in list(self._waiters)[: max(free, 0)]:
+            self._waiters.remove(waiter)
+            if not waiter.done():
+                waiter.set_result(None)
+
+
+class CircuitBreaker:
+    """Hold polls back while Alarm.com keeps failing or asks us to wait.
+
+    Opens after CIRCUIT_BREAKER_THRESHOLD consecutive failures, for a jittered
+    exponential backoff, or as long as a 429 response's Retry-After asks.
+    The first request after that is let through to probe the API again.
+    """
+
+    def __init__(self) -> None:
+        """Initialize a closed breaker."""
+        self.failures = 0
+        self._open_until = 0.0
+
+    @property
+    def retry_in(self) -> float:
+        """Seconds until polls are let through again."""
+        return max(0.0, self._open_until - time.monotonic())
+
+    def record_success(self) -> None:
+        """Close the breaker."""
+        self.failures = 0
+        self._open_until = 0.0
+
+    def record_failure(self, retry_after: float | None = None) -> None:
+        """Count a failure and open the breaker if needed."""
+        self.failures += 1
+        delay = 0.0
+        if self.failures >= CIRCUIT_BREAKER_THRESHOLD:
+            backoff = BACKOFF_BASE.total_seconds() * 2 ** (
+                self.failures - CIRCUIT_BREAKER_THRESHOLD
+            )
+            delay = min(backoff, BACKOFF_MAX.total_seconds())
+            delay *= 1 + random.uniform(-BACKOFF_JITTER, BACKOFF_JITTER)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        if delay:
+            self._open_until = max(self._open_until, time.monotonic() + delay)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the breaker state for diagnostics."""
+        return {"failures": self.failures, "retry_in": self.retry_in}
+
+
+def retry_after(err: BaseException) -> float | None:
+    """Return the delay asked by a 429 response behind an error, if any."""
+    seen = set()
+    while err is not None and id(err) not in seen:
+        seen.add(id(err))
+        if (
+            isinstance(err, ClientResponseError)
+            and err.status == HTTP_TOO_MANY_REQUESTS
+        ):
+            return _parse_retry_after(err.headers and err.headers.get("Retry-After"))
+        err = err.__cause__ or err.__context__
+    return None
+
+
+def _parse_retry_after(value: str | None) -> float:
+    """Parse a Retry-After header, in seconds or as an HTTP date."""
+    if not value:
+        return BACKOFF_BASE.total_seconds()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return BACKOFF_BASE.total_seconds()
+    return max(0.0, (retry_at - dt_util.utcnow()).total_seconds())
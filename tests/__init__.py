@@ -0,0 +1 @@
+"""Tests for the Alarm.com Redux integration."""
@@ -0,0 +1,73 @@
+"""Fixtures for the Alarm.com Redux tests."""
+from __future__ import annotations
+
+from collections.abc import Generator
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from aiohttp import ClientResponseError
+from pyalarmdotcomredux import AlarmdotcomClient
+import pytest
+
+pytest_plugins = "pytest_homeassistant_custom_component"
+
+ALARM = {
+    "id": "panel-1",
+    "description": "Panel",
+    "state": AlarmdotcomClient.ALARM_STATE_DISARMED,
+}
+SENSORS = [
+    {
+        "id": "sensor-1",
+        "description": "Front Door",
+        "deviceType": AlarmdotcomClient.DEVICETYPE_CONTACT,
+        "state": 1,
+    }
+]
+GARAGE_DOORS = [
+    {
+        "id": "garage-1",
+        "description": "Garage Door",
+        "state": AlarmdotcomClient.GARAGE_DOOR_STATE_CLOSED,
+    }
+]
+THERMOSTATS = [
+    {
+        "id": "thermostat-1",
+        "description": "Thermostat",
+        "ambientTemp": 70,
+        "humidityLevel": 40,
+    }
+]
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations: Any) -> None:
+    """Load the integration from custom_components."""
+
+
+@pytest.fixture
+def alarm_client() -> Generator[MagicMock, None, None]:
+    """Stand in for the Alarm.com client, with an account of one of each.
+
+    The batched account request is refused, so every slice is read through
+    the client.
+    """
+    client = MagicMock()
+    client.async_login = AsyncMock()
+    client.async_get_alarm_data = AsyncMock(return_value=dict(ALARM))
+    client.async_get_sensors_data = AsyncMock(return_value=list(SENSORS))
+    client.async_get_garage_doors_data = AsyncMock(return_value=list(GARAGE_DOORS))
+    client.async_get_thermostats_data = AsyncMock(return_value=list(THERMOSTATS))
+    client.async_alarm_disarm = AsyncMock()
+    client.async_alarm_arm_stay = AsyncMock()
+    client.async_alarm_arm_away = AsyncMock()
+    client.async_open_garage_door = AsyncMock()
+    client.async_close_garage_door = AsyncMock()
+    with patch(
+        "custom_components.alarmdotcomredux.AlarmdotcomClient", return_value=client
+    ), patch(
+        "custom_components.alarmdotcomredux.api.AlarmdotcomApi._async_get_account",
+        side_effect=ClientResponseError(MagicMock(), (), status=404),
+    ):
+        yield client
@@ -0,0 +1,108 @@
+"""Tests for the Alarm.com Redux command queue."""
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+from custom_components.alarmdotcomredux.api import AlarmdotcomApi
+from custom_components.alarmdotcomredux.commands import CommandQueue
+from custom_components.alarmdotcomredux.const import DATA_SENSORS
+
+
+def _command(log: list[str], name: str, gate: asyncio.Event | None = None):
+    """Return a command send that logs when it starts and ends."""
+
+    async def send() -> str:
+        log.append(f"{name} start")
+        if gate is not None:
+            await gate.wait()
+        log.append(f"{name} end")
+        return name
+
+    return send
+
+
+async def test_same_target_in_order() -> None:
+    """Test commands on one target run one at a time, in submission order."""
+    queue = CommandQueue()
+    log: list[str] = []
+    gate = asyncio.Event()
+    first = asyncio.ensure_future(
+        queue.async_submit("panel", "arm_away", _command(log, "arm_away", gate))
+    )
+    second = asyncio.ensure_future(
+        queue.async_submit("panel", "disarm", _command(log, "disarm"))
+    )
+    await asyncio.sleep(0.01)
+    assert log == ["arm_away start"]
+    assert queue.pending == 2
+
+    gate.set()
+    assert await asyncio.gather(first, second) == ["arm_away", "disarm"]
+    assert log == ["arm_away start", "arm_away end", "disarm start", "disarm end"]
+    assert queue.pending == 0
+
+
+async def test_other_targets_concurrent() -> None:
+    """Test commands on different targets do not wait for each other."""
+    queue = CommandQueue()
+    log: list[str] = []
+    gate = asyncio.Event()
+    first = asyncio.ensure_future(
+        queue.async_submit("garage-1", "open", _command(log, "garage-1", gate))
+    )
+    await asyncio.sleep(0.01)
+    await queue.async_submit("garage-2", "open", _command(log, "garage-2"))
+    assert log == ["garage-1 start", "garage-2 start", "garage-2 end"]
+
+    gate.set()
+    await first
+
+
+async def test_duplicate_merged_only_when_last() -> None:
+    """Test a repeated command shares the last one, but not an earlier one."""
+    queue = CommandQueue()
+    log: list[str] = []
+    gate = asyncio.Event()
+    submits = [
+        asyncio.ensure_future(queue.async_submit("panel", command, send))
+        for command, send in (
+            ("arm_away", _command(log, "arm_away", gate)),
+            ("arm_away", _command(log, "arm_away again")),
+            ("disarm", _command(log, "disarm")),
+            ("arm_away", _command(log, "arm_away last")),
+        )
+    ]
+    gate.set()
+    await asyncio.gather(*submits)
+
+    assert log == [
+        "arm_away start",
+        "arm_away end",
+        "disarm start",
+        "disarm end",
+        "arm_away last start",
+        "arm_away last end",
+    ]
+
+
+async def test_polls_wait_for_commands() -> None:
+    """Test polls wait for queued commands, which go first."""
+    api = AlarmdotcomApi(MagicMock())
+    gate = asyncio.Event()
+
+    async def arm_away() -> None:
+        await gate.wait()
+
+    api.alarm_client.async_alarm_arm_away = arm_away
+    api.alarm_client.async_get_sensors_data = AsyncMock(return_value=[])
+    command = asyncio.ensure_future(api.async_command("alarm_arm_away"))
+    await asyncio.sleep(0)
+    poll = asyncio.ensure_future(api.async_fetch(DATA_SENSORS))
+    await asyncio.sleep(0.01)
+    api.alarm_client.async_get_sensors_data.assert_not_called()
+
+    gate.set()
+    await command
+    assert await poll == {}
+    api.alarm_client.async_get_sensors_data.assert_awaited_once()
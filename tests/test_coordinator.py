@@ -0,0 +1,70 @@
+"""Tests for the Alarm.com Redux data update coordinator."""
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+from unittest.mock import MagicMock
+
+from homeassistant.core import HomeAssistant
+from pyalarmdotcomredux import AlarmdotcomClient
+
+from custom_components.alarmdotcomredux.api import AlarmdotcomApi
+from custom_components.alarmdotcomredux.const import DATA_ALARM, DATA_KEYS
+from custom_components.alarmdotcomredux.coordinator import (
+    AlarmdotcomDataUpdateCoordinator,
+)
+from custom_components.alarmdotcomredux.polling import PollPhase
+
+from .conftest import ALARM
+
+NO_POLLING = timedelta(hours=1)
+
+
+async def test_poll_from_before_command_dropped(
+    hass: HomeAssistant, alarm_client: MagicMock
+) -> None:
+    """Test a poll in flight during a command does not undo its confirmation."""
+    release_poll = asyncio.Event()
+    calls = 0
+
+    async def get_alarm_data() -> dict:
+        nonlocal calls
+        calls += 1
+        if calls == 2:
+            # The poll started before the command answers last, and stale
+            await release_poll.wait()
+        elif calls > 2:
+            return {**ALARM, "state": AlarmdotcomClient.ALARM_STATE_ARMED_AWAY}
+        return dict(ALARM)
+
+    alarm_client.async_get_alarm_data.side_effect = get_alarm_data
+    coordinator = AlarmdotcomDataUpdateCoordinator(
+        hass,
+        AlarmdotcomApi(alarm_client),
+        NO_POLLING,
+        NO_POLLING,
+        poll_phase=PollPhase(0),
+        tiers=dict.fromkeys(DATA_KEYS, NO_POLLING),
+    )
+    await coordinator.async_refresh()
+
+    coordinator.api.invalidate(DATA_ALARM)
+    poll = asyncio.ensure_future(coordinator.async_refresh())
+    while calls < 2:
+        await asyncio.sleep(0)
+    await coordinator.async_send_command(
+        DATA_ALARM,
+        "panel-1",
+        AlarmdotcomClient.ALARM_STATE_ARMED_AWAY,
+        "alarm_arm_away",
+    )
+    await hass.async_block_till_done()
+    state = coordinator.data[DATA_ALARM]["panel-1"].state
+    assert state == AlarmdotcomClient.ALARM_STATE_ARMED_AWAY
+    assert coordinator.pending_state(DATA_ALARM, "panel-1") is None
+
+    release_poll.set()
+    await poll
+    state = coordinator.data[DATA_ALARM]["panel-1"].state
+    assert state == AlarmdotcomClient.ALARM_STATE_ARMED_AWAY
+    coordinator.async_stop()
@@ -0,0 +1,49 @@
+"""Tests for the Alarm.com Redux device entities."""
+from __future__ import annotations
+
+from unittest.mock import MagicMock
+
+from homeassistant.const import STATE_UNAVAILABLE
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.alarmdotcomredux.const import (
+    CONF_ACTIVITY_FEED,
+    DATA_SENSORS,
+    DEVICE_REMOVAL_POLLS,
+    DOMAIN,
+)
+
+
+async def test_missing_device_removed_after_polls(
+    hass: HomeAssistant, alarm_client: MagicMock
+) -> None:
+    """Test a missing device is unavailable first and removed after some polls."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={"username": "user", "password": "pass"},
+        options={CONF_ACTIVITY_FEED: False},
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    registry = er.async_get(hass)
+    assert hass.states.get("binary_sensor.front_door").state == "off"
+
+    alarm_client.async_get_sensors_data.return_value = []
+
+    async def _async_poll_sensors() -> None:
+        coordinator.api.invalidate(DATA_SENSORS)
+        await coordinator.async_refresh()
+        await hass.async_block_till_done()
+
+    for _ in range(DEVICE_REMOVAL_POLLS):
+        await _async_poll_sensors()
+        assert hass.states.get("binary_sensor.front_door").state == STATE_UNAVAILABLE
+        assert registry.async_get("binary_sensor.front_door") is not None
+
+    await _async_poll_sensors()
+    assert registry.async_get("binary_sensor.front_door") is None
+    assert hass.states.get("binary_sensor.front_door") is None
@@ -0,0 +1,48 @@
+"""Tests for setting up the Alarm.com Redux integration."""
+from __future__ import annotations
+
+import gc
+from unittest.mock import MagicMock
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.alarmdotcomredux.const import (
+    CONF_ACTIVITY_FEED,
+    CONF_MAX_CONCURRENCY,
+    CONF_TIMEOUT,
+    DOMAIN,
+)
+
+
+async def test_options_update_applies(
+    hass: HomeAssistant, alarm_client: MagicMock
+) -> None:
+    """Test changed options reach the running entry without a reload."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={"username": "user", "password": "pass"},
+        options={CONF_ACTIVITY_FEED: False},
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    assert entry.state is ConfigEntryState.LOADED
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+
+    # The entry only holds a weak reference to its update listener
+    gc.collect()
+    hass.config_entries.async_update_entry(
+        entry,
+        options={**entry.options, CONF_TIMEOUT: 42, CONF_MAX_CONCURRENCY: 2},
+    )
+    await hass.async_block_till_done()
+
+    assert hass.data[DOMAIN][entry.entry_id] is coordinator
+    assert coordinator.api.timeout == 42
+    assert coordinator.api.concurrency.limit == 2
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+    assert entry.state is ConfigEntryState.NOT_LOADED
@@ -0,0 +1,42 @@
+"""Tests for the Alarm.com Redux sensor platform."""
+from __future__ import annotations
+
+from unittest.mock import MagicMock
+
+from homeassistant.components.sensor import DOMAIN as SENSOR_DOMAIN
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.alarmdotcomredux.const import (
+    CONF_ACTIVITY_FEED,
+    CONF_DEADBAND,
+    CONF_SENSOR_FILTERS,
+    DOMAIN,
+)
+
+
+async def test_filter_follows_options(
+    hass: HomeAssistant, alarm_client: MagicMock
+) -> None:
+    """Test changed filter options reach the filter of a running sensor."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={"username": "user", "password": "pass"},
+        options={CONF_ACTIVITY_FEED: False},
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    entity = hass.data[SENSOR_DOMAIN].get_entity("sensor.thermostat_humidity_level")
+    assert entity._filter.deadband == 1
+
+    hass.config_entries.async_update_entry(
+        entry,
+        options={
+            **entry.options,
+            CONF_SENSOR_FILTERS: {"humidityLevel": {CONF_DEADBAND: 5}},
+        },
+    )
+    await hass.async_block_till_done()
+
+    assert entity._filter.deadband == 5
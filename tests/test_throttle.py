@@ -0,0 +1,92 @@
+"""Tests for the Alarm.com Redux request throttling."""
+from __future__ import annotations
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from custom_components.alarmdotcomredux.api import (
+    AlarmdotcomApi,
+    AlarmdotcomThrottledError,
+)
+from custom_components.alarmdotcomredux.const import (
+    BACKOFF_BASE,
+    BACKOFF_JITTER,
+    CIRCUIT_BREAKER_THRESHOLD,
+)
+from custom_components.alarmdotcomredux.throttle import CircuitBreaker
+
+from pyalarmdotcomredux import AlarmdotcomClientError
+
+BASE = BACKOFF_BASE.total_seconds()
+
+
+@pytest.fixture
+def clock():
+    """Control the time seen by the throttle."""
+    with patch("custom_components.alarmdotcomredux.throttle.time") as mock_time:
+        mock_time.monotonic.return_value = 1000.0
+        yield mock_time
+
+
+def test_breaker_opens_after_threshold(clock: MagicMock) -> None:
+    """Test the breaker only opens after consecutive failures."""
+    breaker = CircuitBreaker()
+    for _ in range(CIRCUIT_BREAKER_THRESHOLD - 1):
+        breaker.record_failure()
+    assert breaker.retry_in == 0
+
+    breaker.record_failure()
+    assert BASE * (1 - BACKOFF_JITTER) <= breaker.retry_in
+    assert breaker.retry_in <= BASE * (1 + BACKOFF_JITTER)
+
+
+def test_breaker_half_open(clock: MagicMock) -> None:
+    """Test the probe after the backoff closes the breaker or opens it longer."""
+    breaker = CircuitBreaker()
+    for _ in range(CIRCUIT_BREAKER_THRESHOLD):
+        breaker.record_failure()
+
+    # Half-open: requests are let through again, failures are still on record
+    clock.monotonic.return_value += BASE * (1 + BACKOFF_JITTER)
+    assert breaker.retry_in == 0
+    assert breaker.failures == CIRCUIT_BREAKER_THRESHOLD
+
+    breaker.record_failure()
+    assert breaker.retry_in >= 2 * BASE * (1 - BACKOFF_JITTER)
+
+    clock.monotonic.return_value += 2 * BASE * (1 + BACKOFF_JITTER)
+    breaker.record_success()
+    assert breaker.retry_in == 0
+    assert breaker.failures == 0
+
+
+def test_breaker_retry_after(clock: MagicMock) -> None:
+    """Test a Retry-After opens the breaker on the first failure."""
+    breaker = CircuitBreaker()
+    breaker.record_failure(retry_after=120)
+    assert breaker.retry_in == 120
+
+
+async def test_open_breaker_holds_polls_not_commands(clock: MagicMock) -> None:
+    """Test an open breaker rejects polls and still lets commands through."""
+    api = AlarmdotcomApi(MagicMock())
+    api.alarm_client.async_get_sensors_data = AsyncMock(
+        side_effect=AlarmdotcomClientError
+    )
+    api.alarm_client.async_alarm_disarm = AsyncMock()
+    for _ in range(CIRCUIT_BREAKER_THRESHOLD):
+        with pytest.raises(AlarmdotcomClientError):
+            await api._async_send("sensors", api.alarm_client.async_get_sensors_data)
+
+    with pytest.raises(AlarmdotcomThrottledError):
+        await api._async_send("sensors", api.alarm_client.async_get_sensors_data)
+    assert (
+        api.alarm_client.async_get_sensors_data.await_count
+        == CIRCUIT_BREAKER_THRESHOLD
+    )
+
+    await api.async_command("alarm_disarm")
+    api.alarm_client.async_alarm_disarm.assert_awaited_once()
+    # The command went through, so the API is reachable again
+    assert api.circuit_breaker.retry_in == 0